@@ -0,0 +1,197 @@
+"""Spec generation benchmarks.
+
+Times `generate_spec` (cold and warm), `add_pyramid_paths`,
+`get_operations` and `AutoDoc.to_dict` on a synthetic application,
+and reports the peak memory of a cold build. Run it standalone::
+
+    python -m benchmarks.bench_spec --services 200 --methods 5 --output results.json
+
+or, with small applications, through pytest::
+
+    pytest benchmarks
+
+The JSON report can be stored per release to track regressions.
+"""
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+
+from apispec import APISpec
+from apispec.ext.marshmallow import MarshmallowPlugin
+from pyramid.request import Request
+from pyramid_apispec.helpers import is_view, reformat_pattern
+
+from benchmarks.synthetic import AppShape, make_config
+from cornice_apispec import clear_caches, generate_spec
+from cornice_apispec.autodoc import AutoDoc
+from cornice_apispec.operations import get_operations
+from cornice_apispec.paths import add_pyramid_paths
+
+try:
+    import tracemalloc
+except ImportError:  # pragma: no cover
+    tracemalloc = None
+
+timer = getattr(time, 'perf_counter', time.time)
+
+SWAGGER_INFO = {
+    'title': 'Benchmark API',
+    'version': '1.0.0',
+    'show_head': False,
+}
+PLUGINS = [MarshmallowPlugin]
+
+
+def package_version():
+    try:
+        import pkg_resources
+        return pkg_resources.get_distribution('cornice_apispec').version
+    except Exception:
+        return 'unknown'
+
+
+def timed(func, repeat):
+    durations = []
+    for _ in range(repeat):
+        gc.collect()
+        start = timer()
+        func()
+        durations.append(timer() - start)
+    return summarize(durations)
+
+
+def summarize(durations):
+    ordered = sorted(durations)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        median = ordered[middle]
+    else:
+        median = (ordered[middle - 1] + ordered[middle]) / 2.0
+    return {
+        'repeat': len(ordered),
+        'min': ordered[0],
+        'median': median,
+        'mean': sum(ordered) / len(ordered),
+        'max': ordered[-1],
+    }
+
+
+def peak_memory(func):
+    if tracemalloc is None:
+        return None
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def documented_views(registry, route):
+    return [
+        view for view in registry.introspector.related(route)
+        if is_view(view) and view.get('apispec_show') and view.get('request_methods')
+    ]
+
+
+def run_benchmarks(shape, repeat=5, workers=0):
+    """Run every benchmark on an application of `shape`; return the report dict.
+
+    `workers` is the `cornice_apispec.workers` setting of the application.
+    """
+    start = timer()
+    config = make_config(shape, {'cornice_apispec.workers': workers})
+    setup_time = timer() - start
+
+    registry = config.registry
+    request = Request.blank('/')
+    request.registry = registry
+    route = registry.introspector.get('routes', 'service_0')
+    pattern = reformat_pattern(route['pattern'])
+    cornice_service = registry.cornice_services[route['pattern']]
+    views = documented_views(registry, route)
+
+    def new_spec():
+        return APISpec(title='Benchmark API', version='1.0.0', plugins=[MarshmallowPlugin()], openapi_version='3.0.2')
+
+    def cold():
+        clear_caches(registry)
+        return generate_spec(request, SWAGGER_INFO, plugins=PLUGINS)
+
+    def warm():
+        return generate_spec(request, SWAGGER_INFO, plugins=PLUGINS)
+
+    def paths():
+        add_pyramid_paths(new_spec(), 'service_0', registry=registry)
+
+    def operations():
+        spec = new_spec()
+        for view in views:
+            get_operations(spec, pattern, view, None, show_head=False, show_options=True,
+                           cornice_service=cornice_service)
+
+    def autodoc():
+        for view in views:
+            AutoDoc(view['request_methods'], view, cornice_service).to_dict()
+
+    openapi_spec = cold()
+    results = {
+        'generate_spec_cold': timed(cold, repeat),
+        'generate_spec_warm': timed(warm, repeat),
+        'add_pyramid_paths': timed(paths, repeat),
+        'get_operations': timed(operations, repeat),
+        'autodoc_to_dict': timed(autodoc, repeat),
+    }
+    return {
+        'shape': shape.to_dict(),
+        'workers': workers,
+        'environment': {
+            'cornice_apispec': package_version(),
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+        },
+        'setup_seconds': setup_time,
+        'document': {
+            'paths': len(openapi_spec['paths']),
+            'schemas': len(openapi_spec.get('components', {}).get('schemas', {})),
+            'json_bytes': len(json.dumps(openapi_spec)),
+        },
+        'peak_memory_bytes': peak_memory(cold),
+        'results': results,
+    }
+
+
+def parse_args(argv):
+    defaults = AppShape()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--services', type=int, default=defaults.services)
+    parser.add_argument('--methods', type=int, default=defaults.methods)
+    parser.add_argument('--schemas', type=int, default=defaults.schemas)
+    parser.add_argument('--fields', type=int, default=defaults.fields)
+    parser.add_argument('--depth', type=int, default=defaults.depth)
+    parser.add_argument('--tags', type=int, default=defaults.tags)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=0, help='Processes converting routes')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    shape = AppShape(services=args.services, methods=args.methods, schemas=args.schemas,
+                     fields=args.fields, depth=args.depth, tags=args.tags)
+    report = json.dumps(run_benchmarks(shape, repeat=args.repeat, workers=args.workers), indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
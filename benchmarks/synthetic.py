@@ -0,0 +1,93 @@
+"""Synthetic Cornice applications for the spec generation benchmarks."""
+import marshmallow
+from cornice import Service
+from cornice.validators import marshmallow_body_validator
+from pyramid.config import Configurator
+
+# No 'head': Cornice adds a HEAD view to each GET one
+METHODS = ('get', 'post', 'put', 'patch', 'delete', 'options')
+
+
+class AppShape(object):
+    """Size of a synthetic application.
+
+    :param services: number of Cornice services (one route each)
+    :param methods: methods per service (up to 6)
+    :param schemas: number of distinct request/response schemas
+    :param fields: scalar fields per schema
+    :param depth: levels of `Nested` schemas below each schema
+    :param tags: number of distinct tags spread over the services
+    """
+
+    def __init__(self, services=50, methods=4, schemas=20, fields=8, depth=1, tags=5):
+        self.services = services
+        self.methods = min(methods, len(METHODS))
+        self.schemas = schemas
+        self.fields = fields
+        self.depth = depth
+        self.tags = tags
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+def make_schemas(shape):
+    field_types = (
+        marshmallow.fields.String, marshmallow.fields.Integer, marshmallow.fields.Float,
+        marshmallow.fields.Boolean, marshmallow.fields.DateTime, marshmallow.fields.UUID,
+    )
+    schemas = []
+    for index in range(max(shape.schemas, 1)):
+        nested = None
+        for level in range(shape.depth, -1, -1):
+            attrs = {
+                'field_{}'.format(number): field_types[number % len(field_types)](required=number % 2 == 0)
+                for number in range(shape.fields)
+            }
+            if nested is not None:
+                attrs['child'] = marshmallow.fields.Nested(nested)
+            attrs['__doc__'] = 'Schema {} level {}.'.format(index, level)
+            nested = type('Schema{}Level{}'.format(index, level), (marshmallow.Schema,), attrs)
+        schemas.append(nested)
+    return schemas
+
+
+def make_view(name):
+    def view(request):
+        return {}
+    view.__name__ = name
+    return view
+
+
+def make_config(shape, settings=None):
+    """Return a committed Configurator with `shape.services` services."""
+    config = Configurator(settings=settings or {})
+    config.include('cornice')
+    config.include('cornice_apispec')
+
+    schemas = make_schemas(shape)
+    for index in range(shape.services):
+        service = Service(
+            name='service_{}'.format(index),
+            path='/resources_{}/{{id}}'.format(index),
+            apispec_show=True,
+            apispec_tags=['tag_{}'.format(index % max(shape.tags, 1))],
+            apispec_response_schemas={
+                200: schemas[index % len(schemas)],
+                404: 'Not Found',
+            },
+        )
+        for method in METHODS[:shape.methods]:
+            view_args = {}
+            if method in ('post', 'put', 'patch'):
+                view_args = dict(
+                    schema=schemas[(index + 1) % len(schemas)],
+                    validators=(marshmallow_body_validator,),
+                    content_type='application/json',
+                )
+            service.add_view(method.upper(), make_view('{}_{}'.format(method, index)),
+                             apispec_summary='{} resource {}'.format(method, index), **view_args)
+        config.add_cornice_service(service)
+
+    config.commit()
+    return config
@@ -0,0 +1,31 @@
+import json
+import os
+
+import pytest
+
+from benchmarks.bench_spec import run_benchmarks
+from benchmarks.synthetic import AppShape
+
+# Kept small so the suite stays quick; use the standalone runner for real sizes.
+SHAPES = {
+    'flat': AppShape(services=20, methods=4, schemas=10, fields=6, depth=0, tags=4),
+    'nested': AppShape(services=10, methods=2, schemas=5, fields=4, depth=3, tags=2),
+}
+
+
+@pytest.mark.parametrize('name', sorted(SHAPES))
+def test_spec_generation(name):
+    shape = SHAPES[name]
+
+    report = run_benchmarks(shape, repeat=2)
+
+    assert report['document']['paths'] == shape.services
+    for result in report['results'].values():
+        assert result['repeat'] == 2
+        assert result['min'] <= result['median'] <= result['max']
+
+    # CORNICE_APISPEC_BENCHMARK_DIR=... pytest benchmarks keeps the reports
+    output_dir = os.environ.get('CORNICE_APISPEC_BENCHMARK_DIR')
+    if output_dir:
+        with open(os.path.join(output_dir, 'benchmark-{}.json'.format(name)), 'w') as output:
+            json.dump(report, output, indent=2, sort_keys=True)
@@ -1,20 +1,26 @@
 import logging
 
-from apispec import APISpec
-from cornice_apispec.paths import add_pyramid_paths
-from cornice_apispec.predicates import SwaggerDescriptionPredicate, SwaggerResponseSchemasPredicate, \
-    SwaggerShowInPredicate, SwaggerSummaryPredicate, SwaggerTagsPredicate
+from pyramid.events import ApplicationCreated
+from pyramid.settings import asbool
+
+from cornice_apispec.cache import clear_caches, invalidate_spec_cache  # noqa: F401
+from cornice_apispec.document import SpecDocument, get_server_url, get_spec_document
+from cornice_apispec.derivers import apispec_view_options
+from cornice_apispec.docstrings import clear_docstring_cache  # noqa: F401
+from cornice_apispec.fields import register_field_type  # noqa: F401
+from cornice_apispec.profiling import get_profiler
+from cornice_apispec.spec import build_spec
 
 logger = logging.getLogger(__name__)
 
 
 def includeme(config):
     config.include('pyramid_apispec.views')
-    config.add_view_predicate('apispec_response_schemas', SwaggerResponseSchemasPredicate)
-    config.add_view_predicate('apispec_tags', SwaggerTagsPredicate)
-    config.add_view_predicate('apispec_summary', SwaggerSummaryPredicate)
-    config.add_view_predicate('apispec_description', SwaggerDescriptionPredicate)
-    config.add_view_predicate('apispec_show', SwaggerShowInPredicate)
+    config.add_view_deriver(apispec_view_options)
+    config.add_directive('cornice_apispec_add_spec_view', 'cornice_apispec.views.add_spec_view')
+    config.add_directive('cornice_apispec_add_spec_shard_views', 'cornice_apispec.views.add_spec_shard_views')
+    if asbool(config.registry.settings.get('cornice_apispec.warmup', False)):
+        config.add_subscriber('cornice_apispec.warmup.on_application_created', ApplicationCreated)
     # To auto-generate the Swagger view
     # use settings["auto_generate.swagger.view"] = True
     # or simply do not set anything.
@@ -25,13 +31,16 @@ def includeme(config):
         config.add_route("openapi_spec", "/openapi.json")
         config.pyramid_apispec_add_explorer(
             spec_route_name='openapi_spec')
+    # The routes above have no view: either write your own with
+    # `generate_spec` or call `config.cornice_apispec_add_spec_view()`.
 
 
-def generate_spec(request, swagger_info, plugins, filter_by_tags=False):
+def generate_spec(request, swagger_info, plugins, filter_by_tags=False, use_cache=True, profiler=None, compact=False):
     """Generate OpenAPI Spec.
 
     This function will start the route introspection in Pyramid,
-    looking for views with the following cornice_apispec and cornice predicates:
+    looking for views with the following cornice_apispec view options
+    and cornice predicates:
 
     * `schema`: Cornice predicate for Schema validator
     * `content_type`: Cornice/Pyramid predicate for Content-Type
@@ -39,7 +48,7 @@ def generate_spec(request, swagger_info, plugins, filter_by_tags=False):
     * `apispec_tags`: (List) Tag List for view
     * `apispec_summary`: (Str) Short Summary for view operation in swagger
     * `apispec_description`: (Str) Long description for view operation in swagger
-    * `apispec_show`: (Bool) Only views with this predicate will be included in Swagger
+    * `apispec_show`: (Bool) Only views with this option will be included in Swagger
 
     Examples
     ^^^^^^^^
@@ -86,59 +95,73 @@ def generate_spec(request, swagger_info, plugins, filter_by_tags=False):
         * `tag_list`: Tag dict list. No defaults.
             (example: [{'name': 'my tag', 'description': 'my description'}]).
         * `scheme`: http or https. If not informed, will extract from request.
+        * `dedupe_components`: Move parameters and responses used by several
+            operations to `components`, referenced with `$ref` (default: False)
+        * `compact`: Leave out optional members (see the `compact` parameter)
 
         The `filter_by_tags` option will filter all views which does not have at
         least one tag from swagger_info tag_list.
 
+    Caching
+    ^^^^^^^
+        Generated documents are cached on the registry, keyed by
+        `swagger_info`, `plugins`, `filter_by_tags`, scheme and host.
+        The cache is dropped when the configurator commits again, or
+        explicitly with `invalidate_spec_cache(registry)`. After a
+        commit, only the routes added or changed are converted again. Its size is
+        set by the `cornice_apispec.cache_size` setting (default: 16),
+        for documents and for their per host variants alike.
+        Every call returns a new dict, with new `info` and `components`
+        dicts (and sections): callers may add `security` or
+        `securitySchemes` to them. Paths and operations are shared by
+        every call, so do not mutate them.
+
+    Compact documents
+    ^^^^^^^^^^^^^^^^^
+        With `compact`, generated operations leave out optional members:
+        the empty `content` of responses described by a string, `required`
+        when false, and the docstring of the querystring and headers
+        schemas as description of every parameter (a `description` in the
+        field metadata is kept). Documents served by the spec view are
+        also serialized without whitespace.
+
+    Profiling
+    ^^^^^^^^^
+        Pass a `cornice_apispec.profiling.SpecProfiler` as `profiler` to
+        get the wall time and call counts of each build phase and route
+        from its `report()`. Nothing is recorded on cache hits. The
+        `cornice_apispec.profile_callback` setting (a dotted name) sends
+        the report of every build to a callback instead.
+
     :param request: Pyramid Request
     :param swagger_info: Dict
     :param plugins: APISpec Plugins list
     :param filter_by_tags: Show only views with tags inside tag_list
+    :param use_cache: Reuse documents cached on the registry
+    :param profiler: SpecProfiler recording the build
+    :param compact: Leave out optional members
     :return: Dict
     """
-    def check_tag(view):
-        if not filter_by_tags:
-            return True
-        view_tags = view['introspectable'].get('apispec_tags', [])
-        openapi_tags = [tag['name'] for tag in spec._tags]
-        if not view_tags:
-            return False
-        for tag in view_tags:
-            if tag in openapi_tags:
-                return True
-        return False
-
-    spec = APISpec(
-        title=swagger_info.get('title', "OpenAPI Docs"),
-        version=swagger_info.get('version', '0.1.0'),
-        plugins=[plugin() for plugin in plugins],
-        openapi_version=swagger_info.get('openapi_version', '3.0.2')
-    )
-
-    for tag in swagger_info.get('tag_list', []):
-        spec.tag(tag)
-
-    for view in request.registry.introspector.get_category('views'):
-        show_apispec = view['introspectable'].get('apispec_show', False) is True
-        has_request_methods = view['introspectable'].get('request_methods')
-        has_tag = check_tag(view)
-        if show_apispec and has_request_methods and has_tag:
-            add_pyramid_paths(
-                spec, view['introspectable'].get('route_name'),
-                request=request,
-                show_head=swagger_info.get('show_head', False),
-                show_options=swagger_info.get('show_options', True)
-            )
-
-    openapi_spec = spec.to_dict()
-
-    main_description = swagger_info.get('main_description', "")
-    if main_description:
-        openapi_spec['info'].update({'description': main_description})
-
-    scheme = swagger_info.get('scheme', request.scheme)
-    main_server_url = '{}://{}'.format(scheme, request.host)
-    logger.info('Server URL for swagger json is {}'.format(main_server_url))
-    openapi_spec.update({'servers': [{'url': main_server_url}]})
-
-    return openapi_spec
+    if compact:
+        swagger_info = dict(swagger_info, compact=True)
+    server_url = get_server_url(request, swagger_info)
+    if not use_cache:
+        if profiler is None:
+            profiler = get_profiler(request.registry)
+        spec = build_spec(request.registry, swagger_info, plugins, filter_by_tags=filter_by_tags, profiler=profiler)
+        return SpecDocument(spec).with_servers(server_url)
+
+    document = get_spec_document(
+        request.registry, swagger_info, plugins, filter_by_tags=filter_by_tags, profiler=profiler)
+    return _copy_spec(document.variant(server_url).spec)
+
+
+def _copy_spec(spec):
+    """Copy the members of a cached `spec` callers commonly change."""
+    spec = spec.copy()
+    for name in ('info', 'components'):
+        if name in spec:
+            spec[name] = spec[name].copy()
+    for section, value in spec.get('components', {}).items():
+        spec['components'][section] = value.copy()
+    return spec
@@ -1,5 +1,10 @@
+from cornice.util import to_list
+from marshmallow import fields
+
 from cornice_apispec.constants import DEFAULT_CONTENT_TYPE
+from cornice_apispec.fields import field_to_openapi
 from cornice_apispec.utils import get_schema_name
+from cornice_apispec.validators import get_validator_location
 
 VALIDATOR_FOR_OPEN_API = {
     'querystring': 'query',
@@ -7,6 +12,77 @@ VALIDATOR_FOR_OPEN_API = {
     'path': 'path'
 }
 
+SCHEMA_LOCATIONS = ('body', 'headers', 'querystring')
+
+# HTTP methods sending data in the request body
+BODY_METHODS = ('POST', 'PATCH', 'PUT', 'DELETE')
+
+
+class ServiceMethod(object):
+    """What `AutoDoc` documents of a Cornice service method.
+
+    Resolved in a single pass over the service definitions of `method`:
+    the request schema, its schema for each request location, the
+    validators and the request content type.
+    """
+
+    __slots__ = ('method', 'request_schema', 'validators', 'content_type', 'schema_locations')
+
+    def __init__(self, method, definitions=()):
+        self.method = method.upper()
+        schemas = []
+        content_types = []
+        validators = []
+        for definition_method, _, args in definitions:
+            if definition_method.upper() != self.method:
+                continue
+            schemas.extend(to_list(args.get('schema')))
+            content_types.extend(to_list(args.get('content_type')))
+            for validator in args.get('validators', ()):
+                if validator not in validators:
+                    validators.append(validator)
+        self.request_schema = schemas[0] if schemas else None
+        self.validators = validators
+        self.content_type = (content_types[0] if content_types else None) or DEFAULT_CONTENT_TYPE
+        self.schema_locations = dict((location, self._find_schema(location)) for location in SCHEMA_LOCATIONS)
+
+    def _find_schema(self, location):
+        request_schema = self.request_schema
+        if not request_schema:
+            return None
+        for validator in self.validators:
+            validator_location = get_validator_location(validator)
+            if validator_location == 'all':
+                source_class = request_schema._declared_fields.get(location, None)
+                return source_class.nested if source_class else None
+            if validator_location == location:
+                return request_schema
+
+        # assumes the standard request scheme for http methods that contains data in the request body
+        default_request_schema = request_schema if location == 'body' and self.method in BODY_METHODS else None
+
+        # No valid cornice validator was found
+        # but request_schema exists. In this case,
+        # return the nested match schema
+        maybe_nested = request_schema._declared_fields.get(location, None)
+        return maybe_nested.nested if maybe_nested else default_request_schema
+
+
+def get_service_method(cornice_service, method):
+    """Return the `ServiceMethod` of `method`, cached on `cornice_service`.
+
+    It is resolved again when definitions are added to the service.
+    """
+    cache = cornice_service.__dict__.get('_apispec_methods')
+    if cache is None:
+        cache = cornice_service._apispec_methods = {}
+    method = method.upper()
+    definition_count = len(cornice_service.definitions)
+    cached = cache.get(method)
+    if cached is None or cached[0] != definition_count:
+        cached = cache[method] = (definition_count, ServiceMethod(method, cornice_service.definitions))
+    return cached[1]
+
 
 class AutoDoc(object):
     """Where magic happens.
@@ -18,9 +94,14 @@ class AutoDoc(object):
     * View Request Schema and his location
     * View Response Schemas for each status code
     * View short summary and long description
+
+    With `compact`, optional members are left out: the `content` of
+    responses described by a string, `required` when false, and the
+    schema docstring as description of each of its parameters (the
+    `description` of the field metadata is kept).
     """
 
-    def __init__(self, method, introspectable_view, cornice_service):
+    def __init__(self, method, introspectable_view, cornice_service, compact=False):
         """Init class.
 
         Cornice saves his own @view decorator configurations
@@ -31,11 +112,17 @@ class AutoDoc(object):
         :param method: (str) request method
         :param introspectable_view: Pyramid Introspector View instance
         :param cornice_service (Service): cornice service instance
+        :param compact: (bool) leave out optional members
         """
         self.method = method
         self.view = introspectable_view
         self.view_operations = {self.method.lower(): {}}
         self.cornice_service = cornice_service
+        self.compact = compact
+        if cornice_service is None:  # plain Pyramid view
+            self.service_method = ServiceMethod(method)
+        else:
+            self.service_method = get_service_method(cornice_service, method)
 
     @property
     def tags(self):
@@ -59,21 +146,14 @@ class AutoDoc(object):
 
     @property
     def validators(self):
-        return self.cornice_service.get_validators(self.method)
+        return self.service_method.validators
 
     @property
     def content_type(self):
-        content_type_info = self.cornice_service.get_contenttypes(self.method)
-        try:
-            return content_type_info[0] or DEFAULT_CONTENT_TYPE
-        except IndexError:
-            return DEFAULT_CONTENT_TYPE
+        return self.service_method.content_type
 
     def _find_request_schema(self):
-        try:
-            return self.cornice_service.filter_argumentlist(self.method, 'schema')[0]
-        except IndexError:
-            return None
+        return self.service_method.request_schema
 
     def add_path_parameter(self, path_parameters):
         parameter_list = []
@@ -82,34 +162,15 @@ class AutoDoc(object):
                 'name': parameter_name,
                 'in': 'path',
                 'required': True,
-                'schema': self.get_type_from_field('String'),
+                'schema': self.get_type_from_field(fields.String),
                 'description': "{} parameter".format(parameter_name)
             }]
         self._add_parameter(parameter_list)
 
     def find_schema_for(self, location):
-        if location not in ['body', 'headers', 'querystring']:
+        if location not in SCHEMA_LOCATIONS:
             raise ValueError('Location not valid for find Schema')
-        request_schema = self._find_request_schema()
-        if not request_schema:
-            return None
-        for validator in self.validators:
-            if validator.__dict__.get('location', '') == 'all':
-                source_class = request_schema._declared_fields.get(location, None)
-                return source_class.nested if source_class else None
-            if validator.__dict__.get('location', '') == location:
-                return request_schema
-
-        # assumes the standard request scheme for http methods that contains data in the request body
-        contains_body_method = self.method.lower() in ('post', 'patch', 'put', 'delete')
-        is_location_body = location == 'body'
-        default_request_schema = request_schema if is_location_body and contains_body_method else None
-
-        # No valid cornice validator was found
-        # but request_schema exists. In this case,
-        # return the nested match schema
-        maybe_nested = request_schema._declared_fields.get(location, None)
-        return maybe_nested.nested if maybe_nested else default_request_schema
+        return self.service_method.schema_locations[location]
 
     def to_dict(self):
         self._add_tags()
@@ -132,6 +193,8 @@ class AutoDoc(object):
                             'content': {}
                         }
                     }
+                    if self.compact:
+                        del status_code_dict[status_code]['content']
                 else:
                     schema_name = get_schema_name(schema)
                     status_code_dict = {
@@ -157,9 +220,11 @@ class AutoDoc(object):
             return getattr(field, "load_from", None) or key
 
         parameter_list = []
+        parameter_fields = []
         for parameter_in in ['querystring', 'headers']:
             schema = self.find_schema_for(parameter_in)
             if schema:
+                parameter_fields += list(schema._declared_fields.values())
                 parameter_list += [
                     {
                         'name': _observed_name(key),
@@ -170,6 +235,16 @@ class AutoDoc(object):
                     }
                     for key in schema._declared_fields
                 ]
+        if self.compact:
+            for parameter, field in zip(parameter_list, parameter_fields):
+                if not parameter['required']:
+                    del parameter['required']
+                # the schema docstring describes the schema, not each field
+                description = field.metadata.get('description')
+                if description:
+                    parameter['description'] = description
+                else:
+                    del parameter['description']
         if parameter_list:
             self._add_parameter(parameter_list)
 
@@ -213,20 +288,4 @@ class AutoDoc(object):
 
     @staticmethod
     def get_type_from_field(field):
-        field_name = field.__class__.__name__
-        convert_marshmallow_to_data_type = {
-            'UUID': {"type": "string", "format": "uuid"},
-            'Number': {"type": "number"},
-            'Integer': {"type": "integer"},
-            'Decimal': {"type": "number"},
-            'Boolean': {"type": "boolean"},
-            'Float': {"type": "number", "format": "float"},
-            'DateTime': {"type": "string", "format": "date-time"},
-            'LocalDateTime': {"type": "string", "format": "date-time"},
-            'Time': {"type": "string", "format": "time"},
-            'Date': {"type": "string", "format": "date"},
-            'Email': {"type": "string", "format": "email"},
-            'Bool': {"type": "boolean"},
-            'Int': {"type": "integer"}
-        }
-        return convert_marshmallow_to_data_type.get(field_name, {"type": "string"})
+        return field_to_openapi(field)
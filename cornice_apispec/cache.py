@@ -0,0 +1,279 @@
+import logging
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+from concurrent.futures import Future, TimeoutError
+from pyramid.settings import asbool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 16
+
+# Seconds a caller waits for a build of another thread before building itself
+DEFAULT_WAIT_TIMEOUT = 30
+
+_registry_lock = threading.Lock()
+
+# Every cache, reset in forked processes
+_caches = weakref.WeakSet()
+
+
+class LRUCache(object):
+    """Thread-safe mapping that keeps at most `maxsize` entries.
+
+    The least recently used entry is dropped when a new one
+    does not fit anymore.
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+        _caches.add(self)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                return default
+            self._data[key] = value
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def reset_after_fork(self):
+        """Replace the lock, which a thread that did not survive a fork may hold."""
+        self._lock = threading.RLock()
+
+
+class SpecCache(LRUCache):
+    """OpenAPI documents cached on a Pyramid registry.
+
+    Entries are tied to the registry generation: once the
+    configurator commits new views, every cached
+    document is dropped. With `stale_while_revalidate`, dropped
+    documents are still served while they are rebuilt.
+
+    Builds are single-flight: concurrent callers of `get_or_build`
+    for the same key share the result of a single build.
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE, stale_while_revalidate=False, wait_timeout=DEFAULT_WAIT_TIMEOUT):
+        super(SpecCache, self).__init__(maxsize)
+        self.generation = None
+        # replaced when entries are dropped: builds started before are not cached
+        self._epoch = object()
+        self.stale_while_revalidate = stale_while_revalidate
+        self.wait_timeout = wait_timeout
+        self._stale = OrderedDict()
+        self._futures = {}
+
+    def refresh(self, generation):
+        with self._lock:
+            if generation != self.generation:
+                if self.stale_while_revalidate:
+                    for key, value in self._data.items():
+                        self._stale.pop(key, None)
+                        self._stale[key] = value
+                    while len(self._stale) > self.maxsize:
+                        self._stale.popitem(last=False)
+                self._data.clear()
+                # builds in flight are for the previous generation
+                self._futures.clear()
+                self.generation = generation
+                self._epoch = object()
+
+    def clear(self):
+        with self._lock:
+            super(SpecCache, self).clear()
+            self._stale.clear()
+            self._futures.clear()
+            self._epoch = object()
+
+    def reset_after_fork(self):
+        """Also abandon the builds in flight: their threads did not survive the fork."""
+        super(SpecCache, self).reset_after_fork()
+        # nobody waits for them in this process
+        self._futures = {}
+        self._stale = OrderedDict()
+
+    def get_or_build(self, key, build):
+        """Return the entry for `key`, calling `build()` if there is none.
+
+        Callers arriving while another one builds the entry wait for
+        its result, or get the stale entry at once, when there is one.
+        After `wait_timeout` seconds, they build the entry themselves.
+        """
+        with self._lock:
+            value = self.get(key)
+            if value is not None:
+                return value
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                future = self._futures[key] = Future()
+            stale = self._stale.get(key)
+            epoch = self._epoch
+
+        if stale is not None:
+            if owner:
+                thread = threading.Thread(target=self._build, args=(key, build, future, epoch, True),
+                                          name='cornice-apispec-rebuild')
+                thread.daemon = True
+                thread.start()
+            return stale
+        if owner:
+            return self._build(key, build, future, epoch)
+        try:
+            return future.result(self.wait_timeout)
+        except TimeoutError:
+            logger.warning('OpenAPI spec build still running after %ss, building it again', self.wait_timeout)
+            return build()
+
+    def _build(self, key, build, future, epoch, background=False):
+        try:
+            value = build()
+        except Exception as error:
+            with self._lock:
+                if self._futures.get(key) is future:
+                    del self._futures[key]
+            future.set_exception(error)
+            if background:
+                logger.exception('OpenAPI spec rebuild failed, serving the stale document')
+                return None
+            raise
+        with self._lock:
+            # a build outliving its generation, or a `clear()`, must not be cached
+            if epoch is self._epoch:
+                self.set(key, value)
+                self._stale.pop(key, None)
+            if self._futures.get(key) is future:
+                del self._futures[key]
+        future.set_result(value)
+        return value
+
+
+def bump_generation(registry):
+    """Mark the documents cached for `registry` as out of date."""
+    with _registry_lock:
+        registry.cornice_apispec_generation = registry_generation(registry) + 1
+
+
+def registry_generation(registry):
+    """Return a counter which changes whenever views are committed.
+
+    It is bumped by the `apispec_view_options` view deriver, which
+    Pyramid calls for every view it registers.
+    """
+    return getattr(registry, 'cornice_apispec_generation', 0)
+
+
+def freeze(value):
+    """Turn `swagger_info` like structures into hashable cache keys."""
+    if isinstance(value, dict):
+        return tuple(sorted(((str(key), freeze(item)) for key, item in value.items()), key=lambda pair: pair[0]))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(item) for item in value)
+    return value
+
+
+def spec_cache_key(swagger_info, plugins, filter_by_tags):
+    return (
+        freeze(swagger_info),
+        tuple(plugins),
+        bool(filter_by_tags)
+    )
+
+
+def get_spec_cache(registry):
+    """Return the spec cache of `registry`, dropping stale entries."""
+    cache = getattr(registry, 'cornice_apispec_cache', None)
+    if cache is None:
+        with _registry_lock:
+            cache = getattr(registry, 'cornice_apispec_cache', None)
+            if cache is None:
+                settings = registry.settings or {}
+                maxsize = int(settings.get('cornice_apispec.cache_size', DEFAULT_CACHE_SIZE))
+                stale_while_revalidate = asbool(settings.get('cornice_apispec.stale_while_revalidate', False))
+                wait_timeout = float(settings.get('cornice_apispec.wait_timeout', DEFAULT_WAIT_TIMEOUT))
+                cache = registry.cornice_apispec_cache = SpecCache(
+                    maxsize=maxsize, stale_while_revalidate=stale_while_revalidate, wait_timeout=wait_timeout)
+    cache.refresh(registry_generation(registry))
+    return cache
+
+
+def get_route_fragments(registry, key):
+    """Return the route fragments of the builds with options `key`.
+
+    Unlike documents, fragments outlive commits: the next build
+    only converts the routes which changed.
+    """
+    fragments = getattr(registry, 'cornice_apispec_fragments', None)
+    if fragments is None:
+        with _registry_lock:
+            fragments = getattr(registry, 'cornice_apispec_fragments', None)
+            if fragments is None:
+                fragments = registry.cornice_apispec_fragments = LRUCache(get_spec_cache(registry).maxsize)
+    route_fragments = fragments.get(key)
+    if route_fragments is None:
+        route_fragments = {}
+        fragments.set(key, route_fragments)
+    return route_fragments
+
+
+def invalidate_spec_cache(registry):
+    """Drop every OpenAPI document cached for `registry`, and their route fragments."""
+    for name in ('cornice_apispec_cache', 'cornice_apispec_fragments'):
+        cache = getattr(registry, name, None)
+        if cache is not None:
+            cache.clear()
+
+
+def clear_caches(registry=None):
+    """Drop every cache of cornice_apispec, so the next build starts from scratch.
+
+    Process wide caches (docstrings, schema names, field types) are
+    dropped, and with `registry`, its documents, route fragments and the
+    request schemas of its Cornice services.
+    """
+    from cornice_apispec import docstrings, fields, utils
+
+    docstrings.clear_docstring_cache()
+    utils._instance_names.clear()
+    utils._spec_schemas.clear()
+    with fields._lock:
+        fields._resolved.clear()
+    if registry is not None:
+        invalidate_spec_cache(registry)
+        for service in getattr(registry, 'cornice_services', {}).values():
+            service.__dict__.pop('_apispec_methods', None)
+
+
+def _reset_caches_after_fork():
+    # Threads do not survive a fork: drop the locks and builds they held
+    for cache in list(_caches):
+        cache.reset_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):  # Python 3.7+
+    os.register_at_fork(after_in_child=_reset_caches_after_fork)
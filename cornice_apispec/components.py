@@ -0,0 +1,125 @@
+"""Parameters and responses shared by operations, as components.
+
+Enabled by the `dedupe_components` key of `swagger_info`. Parameter
+and response objects found more than once in a document, identical
+member for member, are moved to `components/parameters` and
+`components/responses`, and every operation references them with
+`$ref`.
+"""
+import hashlib
+import json
+import re
+from collections import OrderedDict
+
+from cornice_apispec.constants import HTTP_METHODS
+
+# Characters OpenAPI does not allow in component names
+INVALID_NAME_CHARACTERS = re.compile(r'[^a-zA-Z0-9._-]+')
+
+MAX_NAME_LENGTH = 64
+
+
+def _key(value):
+    return json.dumps(value, sort_keys=True)
+
+
+def _count(uses, value):
+    if not isinstance(value, dict) or '$ref' in value:
+        return
+    key = _key(value)
+    if key in uses:
+        uses[key][0] += 1
+    else:
+        uses[key] = [1, value]
+
+
+def _component_name(name):
+    return INVALID_NAME_CHARACTERS.sub('_', name).strip('_')[:MAX_NAME_LENGTH]
+
+
+def parameter_name(parameter):
+    return _component_name('{}-{}'.format(parameter.get('name', ''), parameter.get('in', ''))) or 'Parameter'
+
+
+def response_name(response):
+    """The schema of the response, or else its description."""
+    refs = [media_type.get('schema', {}).get('$ref', '') for media_type in (response.get('content') or {}).values()]
+    if len(set(refs)) == 1 and refs[0]:
+        return _component_name(refs[0].rsplit('/', 1)[-1])
+    return _component_name(response.get('description') or '') or 'Response'
+
+
+def _hoist(uses, section, section_name, get_name, min_uses):
+    refs = {}
+    for key, (count, value) in uses.items():
+        if count < min_uses:
+            continue
+        name = get_name(value)
+        if name in section:
+            name = '{}-{}'.format(name, hashlib.sha1(key.encode('utf-8')).hexdigest()[:7])
+        section[name] = value
+        refs[key] = '#/components/{}/{}'.format(section_name, name)
+    return refs
+
+
+def _replace(values, refs):
+    return [{'$ref': refs[_key(value)]} if isinstance(value, dict) and _key(value) in refs else value
+            for value in values]
+
+
+def dedupe_components(spec, min_uses=2):
+    """Return `spec` with its repeated parameters and responses as components.
+
+    `spec` is not modified: changed path items and operations are copies.
+
+    :param spec: Dict, as returned by `cornice_apispec.spec.build_spec`
+    :param min_uses: Number of uses making a component
+    :return: Dict
+    """
+    paths = spec.get('paths', {})
+    parameter_uses = OrderedDict()
+    response_uses = OrderedDict()
+    for path_item in paths.values():
+        for parameter in path_item.get('parameters', ()):
+            _count(parameter_uses, parameter)
+        for method, operation in path_item.items():
+            if method not in HTTP_METHODS:
+                continue
+            for parameter in operation.get('parameters', ()):
+                _count(parameter_uses, parameter)
+            for response in (operation.get('responses') or {}).values():
+                _count(response_uses, response)
+
+    components = OrderedDict(spec.get('components', {}))
+    parameters = OrderedDict(components.get('parameters', {}))
+    responses = OrderedDict(components.get('responses', {}))
+    parameter_refs = _hoist(parameter_uses, parameters, 'parameters', parameter_name, min_uses)
+    response_refs = _hoist(response_uses, responses, 'responses', response_name, min_uses)
+    if not parameter_refs and not response_refs:
+        return spec
+
+    new_paths = OrderedDict()
+    for path, path_item in paths.items():
+        path_item = OrderedDict(path_item)
+        if 'parameters' in path_item:
+            path_item['parameters'] = _replace(path_item['parameters'], parameter_refs)
+        for method, operation in path_item.items():
+            if method not in HTTP_METHODS:
+                continue
+            operation = path_item[method] = OrderedDict(operation)
+            if 'parameters' in operation:
+                operation['parameters'] = _replace(operation['parameters'], parameter_refs)
+            if operation.get('responses'):
+                operation['responses'] = OrderedDict(
+                    (status, _replace([response], response_refs)[0])
+                    for status, response in operation['responses'].items())
+        new_paths[path] = path_item
+
+    if parameters:
+        components['parameters'] = parameters
+    if responses:
+        components['responses'] = responses
+    spec = OrderedDict(spec)
+    spec['paths'] = new_paths
+    spec['components'] = components
+    return spec
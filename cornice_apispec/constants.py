@@ -1 +1,4 @@
 DEFAULT_CONTENT_TYPE = 'text/plain'
+
+# Operation members of an OpenAPI path item
+HTTP_METHODS = frozenset(('get', 'put', 'post', 'delete', 'options', 'head', 'patch', 'trace'))
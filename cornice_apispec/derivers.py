@@ -0,0 +1,27 @@
+from cornice_apispec.cache import bump_generation
+
+APISPEC_VIEW_OPTIONS = (
+    'apispec_response_schemas',
+    'apispec_tags',
+    'apispec_summary',
+    'apispec_description',
+    'apispec_show',
+)
+
+
+def apispec_view_options(view, info):
+    """Accept the `apispec_*` arguments of `add_view`, `view_config` and Cornice.
+
+    They are only documentation: Pyramid stores view options in the view
+    introspectable, where `generate_spec` reads them. Unlike predicates,
+    options take no part in view lookup, so the view is returned as is
+    and nothing runs per request.
+
+    Called when each view is registered, it also drops the cached
+    documents, which do not show that view yet.
+    """
+    bump_generation(info.registry)
+    return view
+
+
+apispec_view_options.options = APISPEC_VIEW_OPTIONS
@@ -0,0 +1,187 @@
+"""OpenAPI documents persisted on disk, keyed by an application fingerprint.
+
+Enabled by the `cornice_apispec.cache_dir` setting. The fingerprint
+covers everything a document is built from: routes, views (callables,
+docstrings and `apispec_*` options), Cornice service arguments, every
+schema class of the marshmallow class registry (module, qualified name
+and fields: schemas are also referenced by name, from docstrings,
+`fields.Nested('Item')` or lambdas), the spec options and the
+versions of the packages building it. A restarted worker with the same
+fingerprint loads the document without converting any view; any change
+gives another fingerprint, so a stale document is never loaded.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+import marshmallow
+from marshmallow import class_registry
+
+from cornice_apispec.spec import build_spec
+
+logger = logging.getLogger(__name__)
+
+# Bump when the document built from the same application changes
+FORMAT_VERSION = 2
+
+PRIMITIVES = (type(None), bool, int, float, str, type(u''))
+
+
+def qualified_name(value):
+    return '{}.{}'.format(getattr(value, '__module__', None),
+                          getattr(value, '__qualname__', getattr(value, '__name__', None)))
+
+
+def describe(value, seen=None):
+    """Return a stable, JSON serializable description of `value`.
+
+    Classes and functions are described by their qualified name (and
+    schemas by their fields, functions by their code), never by their
+    address, so descriptions are the same in every process.
+    """
+    if isinstance(value, PRIMITIVES):
+        return value
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return '<recursion>'
+    seen = seen | {id(value)}
+
+    if isinstance(value, dict):
+        return sorted(([describe(key, seen), describe(item, seen)] for key, item in value.items()), key=repr)
+    if isinstance(value, (list, tuple)):
+        return [describe(item, seen) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((describe(item, seen) for item in value), key=repr)
+    if isinstance(value, type):
+        if issubclass(value, marshmallow.Schema):
+            return [qualified_name(value), describe_schema(value, seen)]
+        return qualified_name(value)
+    if isinstance(value, marshmallow.Schema):
+        return [describe(type(value), seen), describe(dict(
+            (name, getattr(value, name, None)) for name in ('only', 'exclude', 'many', '__apispec__')), seen)]
+    code = getattr(value, '__code__', None)
+    if code is not None:
+        # changes with the function body, e.g. the schema a lambda returns
+        return [qualified_name(value), value.__doc__, hashlib.sha1(code.co_code).hexdigest(), list(code.co_names),
+                [const for const in code.co_consts if isinstance(const, PRIMITIVES)]]
+    if hasattr(value, '__dict__'):
+        # private attributes are caches and counters (e.g. field creation index)
+        attributes = dict((key, item) for key, item in vars(value).items() if not key.startswith('_'))
+        return [qualified_name(type(value)), describe(attributes, seen)]
+    return qualified_name(type(value))
+
+
+def describe_schema(schema_class, seen):
+    fields = []
+    for name, field in sorted(schema_class._declared_fields.items()):
+        fields.append([name, describe(field, seen)])
+    return [schema_class.__doc__, describe(getattr(schema_class.opts, 'exclude', None), seen), fields]
+
+
+def describe_schemas():
+    """Describe the schemas of the marshmallow class registry, by name."""
+    schema_classes = set()
+    for classes in class_registry._registry.values():
+        schema_classes.update(classes)
+    return sorted(([qualified_name(schema_class), describe_schema(schema_class, set())]
+                   for schema_class in schema_classes), key=repr)
+
+
+def describe_views(registry):
+    routes = [
+        [route['introspectable']['name'], route['introspectable']['pattern']]
+        for route in registry.introspector.get_category('routes', default=[])
+    ]
+    views = []
+    for view in registry.introspector.get_category('views', default=[]):
+        intr = view['introspectable']
+        view_callable = intr.get('callable')
+        attr = intr.get('attr')
+        options = dict((key, value) for key, value in intr.items() if key.startswith('apispec_'))
+        views.append([
+            intr.get('route_name'),
+            describe(intr.get('request_methods')),
+            describe(view_callable),
+            getattr(view_callable, '__doc__', None),
+            attr,
+            getattr(getattr(view_callable, attr, None), '__doc__', None) if attr else None,
+            describe(options),
+        ])
+    services = [
+        [path, service.name, describe([[method, describe(view), describe(args)]
+                                       for method, view, args in service.definitions])]
+        for path, service in sorted(getattr(registry, 'cornice_services', {}).items())
+    ]
+    return [routes, views, services]
+
+
+def spec_fingerprint(registry, swagger_info, plugins, filter_by_tags=False):
+    """Hex digest identifying the document built with these options."""
+    import apispec
+
+    from cornice_apispec.fields import _field_types
+
+    description = [
+        FORMAT_VERSION, apispec.__version__, marshmallow.__version__,
+        describe(swagger_info), [qualified_name(plugin) for plugin in plugins], bool(filter_by_tags),
+        describe(_field_types),
+        describe_views(registry),
+        describe_schemas(),
+    ]
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class DiskCache(object):
+    """Documents stored as `<fingerprint>.json` files in `directory`."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, fingerprint):
+        return os.path.join(self.directory, '{}.json'.format(fingerprint))
+
+    def load(self, fingerprint):
+        """Return the document stored for `fingerprint`, or None."""
+        try:
+            with open(self.path(fingerprint), 'rb') as cache_file:
+                entry = json.loads(cache_file.read().decode('utf-8'))
+        except (IOError, OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get('fingerprint') != fingerprint:
+            logger.warning('Ignoring OpenAPI spec cache file %s: fingerprint mismatch', self.path(fingerprint))
+            return None
+        return entry['spec']
+
+    def store(self, fingerprint, spec):
+        """Write the document atomically: readers never see a partial file."""
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            descriptor, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.', suffix='.tmp')
+            with os.fdopen(descriptor, 'wb') as cache_file:
+                cache_file.write(json.dumps({'fingerprint': fingerprint, 'spec': spec}).encode('utf-8'))
+            getattr(os, 'replace', os.rename)(tmp_path, self.path(fingerprint))
+        except (IOError, OSError):
+            logger.exception('Could not write the OpenAPI spec cache to %s', self.directory)
+
+
+def get_disk_cache(registry):
+    """Return the `DiskCache` of the `cornice_apispec.cache_dir` setting, or None."""
+    directory = (registry.settings or {}).get('cornice_apispec.cache_dir')
+    return DiskCache(directory) if directory else None
+
+
+def load_or_build_spec(registry, swagger_info, plugins, filter_by_tags=False, **kwargs):
+    """`build_spec`, through the disk cache when one is configured."""
+    disk_cache = get_disk_cache(registry)
+    if disk_cache is None:
+        return build_spec(registry, swagger_info, plugins, filter_by_tags=filter_by_tags, **kwargs)
+    fingerprint = spec_fingerprint(registry, swagger_info, plugins, filter_by_tags)
+    spec = disk_cache.load(fingerprint)
+    if spec is None:
+        spec = build_spec(registry, swagger_info, plugins, filter_by_tags=filter_by_tags, **kwargs)
+        disk_cache.store(fingerprint, spec)
+    return spec
@@ -0,0 +1,50 @@
+"""YAML operations parsed from view docstrings, cached process-wide.
+
+Parsing YAML is the slowest step of a spec build for documented
+views. Docstrings do not change while the process runs, so each one is
+parsed once, whatever the number of builds, methods or views sharing
+it. Entries are keyed on the docstring text: a reloaded view with a new
+docstring is parsed again.
+"""
+import copy
+
+from cornice_apispec.cache import LRUCache
+
+DOCSTRING_CACHE_SIZE = 1024
+
+_docstring_cache = LRUCache(DOCSTRING_CACHE_SIZE)
+
+
+def _parse(docstring):
+    parsed = _docstring_cache.get(docstring)
+    if parsed is None:
+        from apispec.yaml_utils import load_yaml_from_docstring
+        parsed = load_yaml_from_docstring(docstring)
+        _docstring_cache.set(docstring, parsed)
+    return parsed
+
+
+def load_docstring_yaml(docstring):
+    """Cached `apispec.yaml_utils.load_yaml_from_docstring`.
+
+    A copy is returned: callers (and APISpec) may mutate it.
+    """
+    if not docstring:
+        return {}
+    return copy.deepcopy(_parse(docstring))
+
+
+def load_docstring_operations(docstring):
+    """Cached `apispec.yaml_utils.load_operations_from_docstring`."""
+    if not docstring:
+        return {}
+    from apispec.yaml_utils import PATH_KEYS
+    return copy.deepcopy(dict(
+        (key, value) for key, value in _parse(docstring).items()
+        if key in PATH_KEYS or key.startswith('x-')
+    ))
+
+
+def clear_docstring_cache():
+    """Drop every parsed docstring, e.g. after reloading view modules."""
+    _docstring_cache.clear()
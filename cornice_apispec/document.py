@@ -0,0 +1,211 @@
+import hashlib
+import json
+import logging
+import os
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+
+from cornice_apispec.cache import DEFAULT_CACHE_SIZE, LRUCache, get_route_fragments, get_spec_cache, spec_cache_key
+from cornice_apispec.disk_cache import load_or_build_spec
+from cornice_apispec.profiling import get_profiler
+from cornice_apispec.serializers import dump_spec, iter_json, load_spec_file
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+SERVER_URL_PLACEHOLDER = '__cornice_apispec_server_url__'
+
+
+def gzip_compress(body):
+    # gzip container, with a zeroed mtime so the output is reproducible
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(body) + compressor.flush()
+
+
+# Supported content codings, by server preference
+COMPRESSORS = OrderedDict()
+if brotli is not None:
+    COMPRESSORS['br'] = brotli.compress
+COMPRESSORS['gzip'] = gzip_compress
+
+CONTENT_ENCODINGS = tuple(COMPRESSORS) + ('identity',)
+
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+# Content codings of streamed bodies, compressed on the fly
+STREAM_COMPRESSORS = OrderedDict([('gzip', gzip_chunks)])
+
+STREAM_CONTENT_ENCODINGS = tuple(STREAM_COMPRESSORS) + ('identity',)
+
+
+class SpecDocument(object):
+    """OpenAPI document built once and served many times.
+
+    `spec` is the document without its `servers` entry, which depends
+    on the request. Every server URL gets its own `SpecVariant`, kept
+    in a bounded LRU. Variants share the document serialized once per
+    format with a placeholder URL, so serving a new host only splices
+    its URL in. `compact` documents are serialized to JSON without
+    whitespace.
+    """
+
+    def __init__(self, spec, maxsize=DEFAULT_CACHE_SIZE, last_modified=None, compact=False):
+        self.spec = spec
+        self.compact = compact
+        # HTTP dates have no sub-second precision
+        self.last_modified = (last_modified or datetime.utcnow()).replace(microsecond=0)
+        self._variants = LRUCache(maxsize)
+        self._templates = {}
+
+    def with_servers(self, server_url):
+        spec = dict(self.spec)
+        spec['servers'] = [{'url': server_url}]
+        return spec
+
+    def template(self, output_format='json'):
+        """Document serialized in `output_format`, split around the server URL."""
+        template = self._templates.get(output_format)
+        if template is None:
+            body = dump_spec(self.with_servers(SERVER_URL_PLACEHOLDER), output_format,
+                             compact=self.compact).encode('utf-8')
+            # quoted in JSON, a plain scalar in YAML
+            placeholder = SERVER_URL_PLACEHOLDER.encode('utf-8')
+            if output_format == 'json':
+                placeholder = json.dumps(SERVER_URL_PLACEHOLDER).encode('utf-8')
+            # `servers` is the last member, so the last match is ours
+            template = self._templates[output_format] = tuple(body.rsplit(placeholder, 1))
+        return template
+
+    @property
+    def json_template(self):
+        return self.template('json')
+
+    def variant(self, server_url):
+        variant = self._variants.get(server_url)
+        if variant is None:
+            logger.info('Server URL for swagger json is {}'.format(server_url))
+            variant = SpecVariant(self, server_url)
+            self._variants.set(server_url, variant)
+        return variant
+
+
+class SpecVariant(object):
+    """The document as served for a single server URL.
+
+    Bodies are serialized once per format (JSON or YAML), and
+    compressed once per content coding, when first asked for.
+    """
+
+    def __init__(self, document, server_url):
+        self.document = document
+        self.server_url = server_url
+        self.spec = document.with_servers(server_url)
+        # (format, content coding): body
+        self._bodies = {}
+        # format: ETag of the uncompressed body
+        self._etags = {}
+
+    @property
+    def body(self):
+        """JSON bytes of `spec`."""
+        return self.get_body()
+
+    @property
+    def etag(self):
+        """Strong ETag, the content hash of `body`."""
+        return self.get_etag()
+
+    def iter_body(self, encoding='identity'):
+        """Stream the JSON body, serialized and compressed on the fly."""
+        chunks = iter_json(self.spec, compact=self.document.compact)
+        if encoding != 'identity':
+            chunks = STREAM_COMPRESSORS[encoding](chunks)
+        return chunks
+
+    def stream_etag(self):
+        """Compute `etag` from `iter_body()`, without keeping the body."""
+        if 'json' not in self._etags:
+            digest = hashlib.sha1()
+            for chunk in self.iter_body():
+                digest.update(chunk)
+            self._etags['json'] = digest.hexdigest()
+        return self._etags['json']
+
+    def get_body(self, encoding='identity', output_format='json'):
+        body = self._bodies.get((output_format, encoding))
+        if body is None:
+            if encoding == 'identity':
+                prefix, suffix = self.document.template(output_format)
+                # a JSON string is a double-quoted YAML scalar as well
+                body = prefix + json.dumps(self.server_url).encode('utf-8') + suffix
+            else:
+                body = COMPRESSORS[encoding](self.get_body(output_format=output_format))
+            self._bodies[(output_format, encoding)] = body
+        return body
+
+    def get_etag(self, encoding='identity', output_format='json'):
+        etag = self._etags.get(output_format)
+        if etag is None:
+            etag = self._etags[output_format] = hashlib.sha1(self.get_body(output_format=output_format)).hexdigest()
+        # Each coding is a distinct representation, with its own strong ETag
+        if encoding == 'identity':
+            return etag
+        return '{}-{}'.format(etag, encoding)
+
+
+def get_server_url(request, swagger_info):
+    scheme = swagger_info.get('scheme', request.scheme)
+    return '{}://{}'.format(scheme, request.host)
+
+
+def get_spec_document(registry, swagger_info, plugins, filter_by_tags=False, profiler=None):
+    """Return the cached `SpecDocument` for these options, building it if needed.
+
+    `profiler` records the build, if one happens. It defaults to the one
+    configured by the `cornice_apispec.profile_callback` setting.
+    Builds after a commit only convert the routes added or changed
+    since the previous build with these options.
+    """
+    cache = get_spec_cache(registry)
+    key = spec_cache_key(swagger_info, plugins, filter_by_tags)
+
+    def build():
+        spec = load_or_build_spec(registry, swagger_info, plugins, filter_by_tags=filter_by_tags,
+                                  profiler=profiler or get_profiler(registry),
+                                  fragments=get_route_fragments(registry, key))
+        return SpecDocument(spec, maxsize=cache.maxsize, compact=swagger_info.get('compact', False))
+
+    return cache.get_or_build(key, build)
+
+
+def get_prebuilt_document(registry, path, compact=False):
+    """Return the `SpecDocument` of a spec file written by `cornice-apispec-build`.
+
+    The file is read once and cached like a built document. Its
+    `servers` entry, if any, is replaced by the request server URL, and
+    its modification time is the document `Last-Modified`, so replicas
+    serving the same file answer with the same validators. With
+    `compact`, it is served without whitespace.
+    """
+    cache = get_spec_cache(registry)
+
+    def load():
+        spec = load_spec_file(path)
+        spec.pop('servers', None)
+        last_modified = datetime.utcfromtimestamp(os.path.getmtime(path))
+        return SpecDocument(spec, maxsize=cache.maxsize, last_modified=last_modified, compact=compact)
+
+    return cache.get_or_build(('prebuilt', path, compact), load)
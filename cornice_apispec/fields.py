@@ -0,0 +1,130 @@
+"""Marshmallow fields to OpenAPI schemas, for AutoDoc parameters.
+
+Types are registered per field class and looked up along the field
+class MRO, so subclasses of a known field (e.g. of `Integer`) get its
+type. The resolved type is cached per class.
+"""
+import threading
+
+import marshmallow
+from marshmallow import fields, validate
+
+_lock = threading.Lock()
+
+# Field class: OpenAPI type (and format)
+_field_types = {}
+# Field class: resolved OpenAPI type, along the MRO
+_resolved = {}
+
+# Values that can be written as-is in a JSON document
+JSON_SCALARS = (type(None), bool, int, float, str, type(u''))
+
+
+def register_field_type(field_class, openapi_type, openapi_format=None):
+    """Document instances of `field_class` (and its subclasses) with this type.
+
+    Example::
+
+        register_field_type(MoneyField, 'string', 'decimal')
+
+    :param field_class: marshmallow Field subclass
+    :param openapi_type: OpenAPI `type`
+    :param openapi_format: OpenAPI `format`
+    """
+    data_type = {'type': openapi_type}
+    if openapi_format is not None:
+        data_type['format'] = openapi_format
+    with _lock:
+        _field_types[field_class] = data_type
+        # Subclasses may have resolved to another registered ancestor
+        _resolved.clear()
+
+
+def _resolve(field_class):
+    data_type = _resolved.get(field_class)
+    if data_type is None:
+        for cls in field_class.__mro__:
+            if cls in _field_types:
+                data_type = _field_types[cls]
+                break
+        else:
+            data_type = {'type': 'string'}
+        _resolved[field_class] = data_type
+    return data_type
+
+
+def is_json(value):
+    """Return True when `value` can be written as-is in a JSON document."""
+    if isinstance(value, JSON_SCALARS):
+        return True
+    if isinstance(value, (list, tuple)):
+        return all(is_json(item) for item in value)
+    if isinstance(value, dict):
+        return all(isinstance(key, str) and is_json(item) for key, item in value.items())
+    return False
+
+
+def _enum(choices):
+    # e.g. dates or Enum members would break JSON serialization
+    choices = list(choices)
+    return choices if all(isinstance(choice, JSON_SCALARS) for choice in choices) else None
+
+
+def field_to_openapi(field):
+    """Return the OpenAPI schema of a marshmallow field (instance or class).
+
+    Besides the type, instances get `items` for lists, `enum` from their
+    `OneOf` validators and `default` from their load default, when these
+    values can be written in JSON.
+    """
+    if isinstance(field, type):
+        return dict(_resolve(field))
+    data_type = dict(_resolve(type(field)))
+
+    if isinstance(field, fields.List):
+        # `inner` since marshmallow 3
+        inner = getattr(field, 'inner', None) or getattr(field, 'container', None)
+        data_type['items'] = field_to_openapi(inner) if inner is not None else {}
+    elif isinstance(field, fields.Nested) and getattr(field, 'many', False):
+        data_type = {'type': 'array', 'items': data_type}
+
+    for validator in getattr(field, 'validators', None) or []:
+        if isinstance(validator, validate.OneOf):
+            choices = _enum(validator.choices)
+            if choices is not None:
+                data_type['enum'] = choices
+    enum = getattr(field, 'enum', None)  # marshmallow 3 Enum field
+    if enum is not None and 'enum' not in data_type:
+        by_value = getattr(field, 'by_value', False)
+        choices = _enum(member.value if by_value else member.name for member in enum)
+        if choices is not None:
+            data_type['enum'] = choices
+
+    # `load_default` since marshmallow 3.13, which warns when `missing` is read
+    try:
+        default = field.load_default
+    except AttributeError:
+        default = getattr(field, 'missing', marshmallow.missing)
+    if default is not marshmallow.missing and not callable(default) and is_json(default):
+        data_type['default'] = default
+    return data_type
+
+
+for _field_class, _openapi_type, _openapi_format in (
+        (fields.Field, 'string', None),
+        (fields.UUID, 'string', 'uuid'),
+        (fields.Number, 'number', None),
+        (fields.Integer, 'integer', None),
+        (fields.Decimal, 'number', None),
+        (fields.Float, 'number', 'float'),
+        (fields.Boolean, 'boolean', None),
+        (fields.DateTime, 'string', 'date-time'),
+        (fields.Time, 'string', 'time'),
+        (fields.Date, 'string', 'date'),
+        (fields.Email, 'string', 'email'),
+        (fields.Url, 'string', 'uri'),
+        (fields.List, 'array', None),
+        (fields.Nested, 'object', None),
+        (fields.Dict, 'object', None),
+):
+    register_field_type(_field_class, _openapi_type, _openapi_format)
@@ -1,21 +1,43 @@
 import re
 
-from apispec.yaml_utils import load_operations_from_docstring, load_yaml_from_docstring
 from pyramid_apispec.helpers import ALL_METHODS, is_string
 
 from cornice_apispec.autodoc import AutoDoc
+from cornice_apispec.docstrings import load_docstring_operations, load_docstring_yaml
+from cornice_apispec.profiling import NULL_PROFILER
 from cornice_apispec.utils import add_schema_in_spec
 
 
-def get_operations(spec, uri_pattern, view, operations, show_head, show_options, cornice_service, autodoc=True):
+def get_operations(spec, uri_pattern, view, operations, show_head, show_options, cornice_service, autodoc=True,
+                   profiler=NULL_PROFILER, compact=False):
+    operations, schemas = collect_operations(
+        uri_pattern, view, operations, show_head, show_options, cornice_service, autodoc=autodoc, profiler=profiler,
+        compact=compact)
+    with profiler.phase('schemas'):
+        for schema in schemas:
+            add_schema_in_spec(spec, schema)
+    return operations
+
+
+def collect_operations(uri_pattern, view, operations, show_head, show_options, cornice_service, autodoc=True,
+                       profiler=NULL_PROFILER, compact=False):
+    """Build the operations of `view`, without touching any spec.
+
+    With `compact`, generated operations leave out optional members
+    (see `AutoDoc`).
+
+    :return: (operations dict, list of request schemas to add in spec)
+    """
+    schemas = []
     if operations is not None:
-        return operations
+        return operations, schemas
 
     operations = {}
 
     # views can be class based
     if view.get("attr"):
-        global_meta = load_operations_from_docstring(view["callable"].__doc__)
+        with profiler.phase('docstrings'):
+            global_meta = load_docstring_operations(view["callable"].__doc__)
         if global_meta:
             operations.update(global_meta)
         f_view = getattr(view["callable"], view["attr"])
@@ -24,35 +46,38 @@ def get_operations(spec, uri_pattern, view, operations, show_head, show_options,
         f_view = view.get("callable")
 
     methods = view.get("request_methods")
-    view_operations = load_operations_from_docstring(f_view.__doc__)
+    with profiler.phase('docstrings'):
+        view_operations = load_docstring_operations(f_view.__doc__)
     if not view_operations:
         view_operations = {}
         if is_string(methods):
             methods = [methods]
-        if not methods:
-            methods = ALL_METHODS[:]
+        # copy: Pyramid may store a tuple, e.g. ('GET', 'HEAD')
+        methods = list(methods or ALL_METHODS)
         if 'HEAD' in methods and not show_head:
             methods.remove('HEAD')
         if 'OPTIONS' in methods and not show_options:
             methods.remove('OPTIONS')
-        operation = load_yaml_from_docstring(f_view.__doc__)
+        with profiler.phase('docstrings'):
+            operation = load_docstring_yaml(f_view.__doc__)
         if operation:
             for method in methods:
                 view_operations[method.lower()] = operation
         elif autodoc:
-            path_parameters = get_uri_placeholders(uri_pattern)
-            for method in methods:
-                auto_doc = AutoDoc(method, view, cornice_service)
-                if path_parameters:
-                    auto_doc.add_path_parameter(path_parameters)
-                request_schema = auto_doc.find_schema_for('body')
-                if request_schema:
-                    add_schema_in_spec(spec, request_schema)
-                view_operations = auto_doc.to_dict()
+            with profiler.phase('autodoc'):
+                path_parameters = get_uri_placeholders(uri_pattern)
+                for method in methods:
+                    auto_doc = AutoDoc(method, view, cornice_service, compact=compact)
+                    if path_parameters:
+                        auto_doc.add_path_parameter(path_parameters)
+                    request_schema = auto_doc.find_schema_for('body')
+                    if request_schema:
+                        schemas.append(request_schema)
+                    view_operations = auto_doc.to_dict()
 
     operations.update(view_operations)
 
-    return operations
+    return operations, schemas
 
 
 def get_uri_placeholders(uri_pattern):
@@ -1,9 +1,12 @@
+import copy
 import inspect
+from collections import OrderedDict
 
 from pyramid.threadlocal import get_current_request
 from pyramid_apispec.helpers import check_methods_matching, is_view, reformat_pattern, should_ignore_view
 
-from cornice_apispec.operations import get_operations
+from cornice_apispec.operations import collect_operations
+from cornice_apispec.profiling import NULL_PROFILER
 from cornice_apispec.utils import add_schema_in_spec
 
 
@@ -14,6 +17,7 @@ def add_pyramid_paths(
         request_method=None,
         operations=None,
         autodoc=True,
+        registry=None,
         **kwargs
 ):
     """
@@ -30,29 +34,146 @@ def add_pyramid_paths(
         Operations dict that will be used instead of introspection
     :param autodoc:
         Include information about endpoints without markdown docstring
+    :param registry:
+        Registry to introspect, instead of `request.registry`
     :param kwargs:
         Additional kwargs for predicate matching
     :return:
     """
-    if request is None:
-        request = get_current_request()
+    if registry is None:
+        if request is None:
+            request = get_current_request()
+        registry = request.registry
 
-    show_head = kwargs.pop('show_head', False)
-    show_options = kwargs.pop('show_options', True)
-    registry = request.registry
-    # TODO: This is the original pyramid_apispec introspector use,
-    #   getting routes instead of views.
-    #   I don't know if we can ride this one and use only the
-    #   introspector views used before in `generate_spec` function
-    introspector = registry.introspector
-    route = introspector.get("routes", route_name)
-    introspectables = introspector.related(route)
-    ignored_view_names = kwargs.pop("ignored_view_names", None)
+    route = registry.introspector.get("routes", route_name)
     # needs to be rewritten to internal name
     if request_method:
         kwargs["request_methods"] = request_method
 
-    for maybe_view in introspectables:
+    route_operations, schemas = get_route_operations(
+        registry, route, operations=operations, autodoc=autodoc, **kwargs)
+    for schema in schemas:
+        add_schema_in_spec(spec, schema)
+    if route_operations is not None:
+        spec.path(reformat_pattern(route["pattern"]), operations=route_operations)
+
+
+class RouteFragment(object):
+    """Operations and schemas converted from the views of one route."""
+
+    __slots__ = ('fingerprint', 'operations', 'schemas')
+
+    def __init__(self, fingerprint, operations, schemas):
+        self.fingerprint = fingerprint
+        self.operations = operations
+        self.schemas = schemas
+
+
+def route_fingerprint(registry, route):
+    """Identify the introspectables a route fragment is converted from.
+
+    Introspectables keep their discriminator and registration order
+    across commits, so the fingerprint only changes when the route or
+    one of its views is added, removed or overridden.
+    """
+    return (route.order, tuple(
+        (intr.discriminator_hash, intr.order) for intr in registry.introspector.related(route)))
+
+
+def add_pyramid_routes(spec, registry, route_names, autodoc=True, profiler=NULL_PROFILER, fragments=None,
+                       workers=0, **kwargs):
+    """Add several routes to spec, walking each route's views only once.
+
+    Routes whose patterns are the same OpenAPI path are merged,
+    so `spec.path` is called once per path.
+
+    With `fragments`, a dict of route name to `RouteFragment` kept from
+    a previous build with the same options, only the routes added or
+    changed since are converted again; `fragments` is updated in place.
+
+    With `workers`, routes are converted by that many forked processes
+    (see `cornice_apispec.workers`). Results are added to spec in route
+    order, so the document is the same.
+
+    :param spec: ApiSpec object
+    :param registry: Pyramid Registry
+    :param route_names: Route names to inspect, in spec order
+    :param autodoc: Include information about endpoints without markdown docstring
+    :param profiler: `cornice_apispec.profiling.SpecProfiler` recording the build
+    :param fragments: Dict of `RouteFragment` to reuse and update
+    :param workers: Number of worker processes converting the routes
+    :param kwargs: `show_head` / `show_options` / `compact` and predicates for view matching
+    """
+    introspector = registry.introspector
+    routes_by_path = OrderedDict()
+    # Routes to convert: reused fragments are skipped
+    pending = OrderedDict()
+    with profiler.phase('introspection'):
+        for route_name in route_names:
+            route = introspector.get("routes", route_name)
+            routes_by_path.setdefault(reformat_pattern(route["pattern"]), []).append(route)
+            fingerprint = None
+            if fragments is not None:
+                fingerprint = route_fingerprint(registry, route)
+                fragment = fragments.get(route_name)
+                if fragment is not None and fragment.fingerprint == fingerprint:
+                    continue
+            pending[route_name] = fingerprint
+
+    converted = {}
+    if workers > 1 and len(pending) > 1:
+        from cornice_apispec.workers import convert_routes
+        with profiler.phase('workers'):
+            converted = convert_routes(registry, list(pending), workers, autodoc=autodoc, **kwargs)
+
+    for pattern, routes in routes_by_path.items():
+        path_operations = None
+        for route in routes:
+            if route["name"] in converted:
+                route_operations, schemas = converted[route["name"]]
+            elif route["name"] in pending:
+                with profiler.route(route["name"]):
+                    route_operations, schemas = get_route_operations(
+                        registry, route, autodoc=autodoc, profiler=profiler, **kwargs)
+            else:
+                fragment = fragments[route["name"]]
+                route_operations, schemas = fragment.operations, fragment.schemas
+            if fragments is not None and route["name"] in pending:
+                fragments[route["name"]] = RouteFragment(pending[route["name"]], route_operations, schemas)
+
+            with profiler.phase('schemas'):
+                for schema in schemas:
+                    add_schema_in_spec(spec, schema)
+            if route_operations is not None:
+                path_operations = path_operations or {}
+                # `spec.path` mutates operations: keep the fragment ones pristine
+                path_operations.update(copy.deepcopy(route_operations) if fragments is not None else route_operations)
+        if path_operations is not None:
+            with profiler.phase('paths'):
+                spec.path(pattern, operations=path_operations)
+
+    if fragments is not None:
+        for route_name in [name for name in list(fragments) if name not in route_names]:
+            fragments.pop(route_name, None)
+
+
+def get_route_operations(registry, route, operations=None, autodoc=True, profiler=NULL_PROFILER, **kwargs):
+    """Collect the operations of every documented view of `route`.
+
+    :return: (operations dict, or None when no view is documented,
+        list of schemas to add in spec)
+    """
+    show_head = kwargs.pop('show_head', False)
+    show_options = kwargs.pop('show_options', True)
+    compact = kwargs.pop('compact', False)
+    ignored_view_names = kwargs.pop("ignored_view_names", None)
+    original_pattern = route["pattern"]
+    pattern = reformat_pattern(original_pattern)
+    cornice_service = registry.cornice_services.get(original_pattern)
+
+    route_operations = None
+    schemas = []
+    for maybe_view in registry.introspector.related(route):
         # skip excluded views/non-views
         if (
                 not is_view(maybe_view)
@@ -65,19 +186,21 @@ def add_pyramid_paths(
         # Find Response Schemas if available in View Predicate
         response_schemas = maybe_view.get('apispec_response_schemas', {})
         for _, schema in response_schemas.items():
-            if inspect.isfunction(schema): # It maybe a lambda function
+            if inspect.isfunction(schema):  # It maybe a lambda function
                 schema = schema()
-            add_schema_in_spec(spec, schema)
-
-        original_pattern = route["pattern"]
-        pattern = reformat_pattern(original_pattern)
-        spec.path(
-            pattern,
-            operations=get_operations(
-                spec, pattern, maybe_view, operations,
-                autodoc=autodoc,
-                show_head=show_head,
-                show_options=show_options,
-                cornice_service=request.registry.cornice_services.get(original_pattern)
-            )
+            schemas.append(schema)
+
+        view_operations, view_schemas = collect_operations(
+            pattern, maybe_view, operations,
+            autodoc=autodoc,
+            show_head=show_head,
+            show_options=show_options,
+            cornice_service=cornice_service,
+            profiler=profiler,
+            compact=compact
         )
+        schemas.extend(view_schemas)
+        route_operations = route_operations or {}
+        route_operations.update(view_operations)
+
+    return route_operations, schemas
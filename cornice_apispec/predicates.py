@@ -1,3 +1,12 @@
+"""Former `apispec_*` view predicates.
+
+They are no longer registered: `includeme` declares these arguments
+as view options instead (see `cornice_apispec.derivers`), so they cost
+nothing per request. The classes are kept for applications that
+register them by themselves.
+"""
+
+
 class SwaggerResponseSchemasPredicate(object):
     def __init__(self, val, config):
         self.val = val
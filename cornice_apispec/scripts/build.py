@@ -0,0 +1,133 @@
+"""Write the OpenAPI document of an application to a file.
+
+Examples::
+
+    cornice-apispec-build development.ini --out openapi.json
+    cornice-apispec-build myapp:main --out openapi.yaml cornice_apispec.eager=false
+
+The application is loaded from a PasteDeploy config file (``file.ini``
+or ``file.ini#name``) or from a dotted ``package.module:main`` function,
+called as ``main({}, **settings)``. Trailing ``key=value`` arguments are
+config file variables, or settings for a dotted main.
+
+The document is built with the options of the spec view registered by
+``config.cornice_apispec_add_spec_view()`` at ``--route``, or with the
+``--swagger-info`` dict. Serve it with the ``cornice_apispec.prebuilt_path``
+setting.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+from pyramid.config import global_registries
+from pyramid.path import DottedNameResolver
+from pyramid.scripts.common import parse_vars
+
+from cornice_apispec.document import SpecDocument
+from cornice_apispec.profiling import get_profiler
+from cornice_apispec.serializers import FORMATS, dump_spec, guess_format
+from cornice_apispec.spec import build_spec
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    try:
+        registry = load_registry(args.app, parse_vars(args.config_vars))
+        spec = build_app_spec(registry, route_name=args.route, swagger_info=args.swagger_info, compact=args.compact)
+    except (LookupError, ValueError) as error:
+        sys.stderr.write('cornice-apispec-build: {}\n'.format(error))
+        return 2
+
+    if args.server_url:
+        spec = SpecDocument(spec).with_servers(args.server_url)
+    write_spec(spec, args.out, args.format or guess_format(args.out), compact=args.compact)
+    return 0
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog='cornice-apispec-build',
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('app', help='PasteDeploy config URI or dotted main function')
+    parser.add_argument('config_vars', nargs='*', default=(),
+                        help='key=value config file variables, or settings for a dotted main')
+    parser.add_argument('--out', required=True, help='Spec file to write')
+    parser.add_argument('--format', choices=FORMATS,
+                        help='Output format (default: guessed from the --out extension)')
+    parser.add_argument('--route', default='openapi_spec',
+                        help='Route name of the spec view (default: openapi_spec)')
+    parser.add_argument('--swagger-info',
+                        help='Dotted name of a swagger_info dict, for apps without a spec view')
+    parser.add_argument('--server-url', help='Write this URL as the document server')
+    parser.add_argument('--compact', action='store_true',
+                        help='Leave out optional members and write JSON without whitespace')
+    return parser.parse_args(argv)
+
+
+def is_config_file(app):
+    return os.path.isfile(app.split('#', 1)[0])
+
+
+def load_registry(app, settings=None):
+    """Return the Pyramid registry of `app`, a config URI or dotted main."""
+    settings = settings or {}
+    if is_config_file(app):
+        from pyramid.paster import get_app, setup_logging
+        setup_logging(app)
+        wsgi_app = get_app(app, options=settings)
+    else:
+        if ':' not in app:
+            raise ValueError('{!r} is neither a config file nor a dotted main function'.format(app))
+        wsgi_app = DottedNameResolver().resolve(app)({}, **settings)
+    # Middlewares may hide the router: fall back to the last registry created
+    registry = getattr(wsgi_app, 'registry', None) or global_registries.last
+    if registry is None:
+        raise LookupError('No Pyramid registry found for {!r}'.format(app))
+    return registry
+
+
+def build_app_spec(registry, route_name='openapi_spec', swagger_info=None, compact=False):
+    """Build the document served by the spec view at `route_name`.
+
+    :param swagger_info: Dotted name of a swagger_info dict, used
+        (with MarshmallowPlugin) when the route has no spec view
+    :param compact: Leave out optional members
+    """
+    spec_view = getattr(registry, 'cornice_apispec_views', {}).get(route_name)
+    if spec_view is not None:
+        swagger_info, plugins, filter_by_tags = spec_view.swagger_info, spec_view.plugins, spec_view.filter_by_tags
+    elif swagger_info is not None:
+        from apispec.ext.marshmallow import MarshmallowPlugin
+        swagger_info = DottedNameResolver().maybe_resolve(swagger_info)
+        plugins, filter_by_tags = [MarshmallowPlugin], False
+    else:
+        raise LookupError(
+            'No spec view at route {!r}: use config.cornice_apispec_add_spec_view() '
+            'or pass --swagger-info'.format(route_name))
+    if compact:
+        swagger_info = dict(swagger_info, compact=True)
+    return build_spec(registry, swagger_info, plugins, filter_by_tags=filter_by_tags,
+                      profiler=get_profiler(registry))
+
+
+def write_spec(spec, path, output_format='json', compact=False):
+    # Write next to the target and rename, so a server never reads a partial file
+    descriptor, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as spec_file:
+            spec_file.write(dump_spec(spec, output_format, compact=compact).encode('utf-8'))
+        # mkstemp files are only readable by their owner
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+        getattr(os, 'replace', os.rename)(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main())
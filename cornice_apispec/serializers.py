@@ -0,0 +1,111 @@
+"""OpenAPI documents to and from JSON or YAML."""
+import json
+import os
+from collections import OrderedDict
+
+FORMATS = ('json', 'yaml')
+
+# Content type of each format
+CONTENT_TYPES = {'json': 'application/json', 'yaml': 'application/yaml'}
+
+# Accepted media types, YAML having no single registered one in older clients
+MEDIA_TYPES = OrderedDict([
+    ('application/json', 'json'),
+    ('application/yaml', 'yaml'),
+    ('application/x-yaml', 'yaml'),
+    ('text/yaml', 'yaml'),
+])
+
+# Members serialized item by item when streaming, and how deep:
+# one chunk per path, one per component
+STREAMED_MEMBERS = {'paths': 1, 'components': 2}
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Item and key separators of `json.dumps`, and without whitespace
+SEPARATORS = (', ', ': ')
+COMPACT_SEPARATORS = (',', ':')
+
+
+def to_json(spec, compact=False):
+    return json.dumps(spec, separators=COMPACT_SEPARATORS if compact else SEPARATORS)
+
+
+def _iter_json(value, depth, separators):
+    if depth == 0 or not isinstance(value, dict) or not value:
+        yield json.dumps(value, separators=separators)
+        return
+    separator = '{'
+    for key, item in value.items():
+        yield '{}{}{}'.format(separator, json.dumps(key), separators[1])
+        for piece in _iter_json(item, depth - 1, separators):
+            yield piece
+        separator = separators[0]
+    yield '}'
+
+
+def iter_json(spec, chunk_size=STREAM_CHUNK_SIZE, compact=False):
+    """Serialize `spec` to JSON, lazily, as UTF-8 chunks of about `chunk_size` bytes.
+
+    The output is the one of `to_json`, byte for byte, but the whole
+    string is never in memory: paths and components are encoded one
+    at a time. Use it as a response `app_iter`.
+    """
+    separators = COMPACT_SEPARATORS if compact else SEPARATORS
+    buffered = []
+    size = 0
+    separator = '{'
+    for key, value in spec.items():
+        pieces = _iter_json(value, STREAMED_MEMBERS.get(key, 0), separators)
+        for piece in _prepend('{}{}{}'.format(separator, json.dumps(key), separators[1]), pieces):
+            piece = piece.encode('utf-8')
+            buffered.append(piece)
+            size += len(piece)
+            if size >= chunk_size:
+                yield b''.join(buffered)
+                buffered = []
+                size = 0
+        separator = separators[0]
+    buffered.append(b'}' if spec else b'{}')
+    yield b''.join(buffered)
+
+
+def _prepend(first, iterable):
+    yield first
+    for item in iterable:
+        yield item
+
+
+def to_yaml(spec):
+    # Plain dicts only: `yaml.safe_dump` cannot represent the OrderedDicts
+    # APISpec returns. The JSON round trip keeps their order.
+    import yaml
+
+    spec = json.loads(json.dumps(spec))
+    try:
+        return yaml.safe_dump(spec, default_flow_style=False, allow_unicode=True, sort_keys=False)
+    except TypeError:  # PyYAML < 5.1 keeps the key order anyway
+        return yaml.safe_dump(spec, default_flow_style=False, allow_unicode=True)
+
+
+def guess_format(path):
+    """Return 'yaml' for .yaml/.yml files, 'json' otherwise."""
+    extension = os.path.splitext(path)[1].lower()
+    return 'yaml' if extension in ('.yaml', '.yml') else 'json'
+
+
+def dump_spec(spec, output_format='json', compact=False):
+    """Serialize `spec`; `compact` JSON has no whitespace (YAML is unchanged)."""
+    if output_format not in FORMATS:
+        raise ValueError('Unknown spec format {!r}, expected one of {}'.format(output_format, FORMATS))
+    return to_yaml(spec) if output_format == 'yaml' else to_json(spec, compact=compact)
+
+
+def load_spec_file(path):
+    """Read a spec written by `cornice-apispec-build`."""
+    with open(path, 'rb') as spec_file:
+        content = spec_file.read().decode('utf-8')
+    if guess_format(path) == 'yaml':
+        import yaml
+        return yaml.safe_load(content)
+    return json.loads(content)
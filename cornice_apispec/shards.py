@@ -0,0 +1,133 @@
+from collections import OrderedDict
+
+from cornice_apispec.cache import get_route_fragments, get_spec_cache, spec_cache_key
+from cornice_apispec.constants import HTTP_METHODS
+from cornice_apispec.disk_cache import load_or_build_spec
+from cornice_apispec.document import SpecDocument
+from cornice_apispec.profiling import get_profiler
+
+# Shard of the operations without tags, as Swagger UI names their group
+UNTAGGED = 'default'
+
+REF_PREFIX = '#/components/'
+
+
+def find_refs(value, refs=None):
+    """Return the set of component `$ref` found anywhere in `value`."""
+    if refs is None:
+        refs = set()
+    if isinstance(value, dict):
+        ref = value.get('$ref')
+        if hasattr(ref, 'startswith') and ref.startswith(REF_PREFIX):
+            refs.add(ref)
+        for item in value.values():
+            find_refs(item, refs)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            find_refs(item, refs)
+    return refs
+
+
+def get_component(components, ref):
+    section, _, name = ref[len(REF_PREFIX):].partition('/')
+    # JSON pointer escaping
+    name = name.replace('~1', '/').replace('~0', '~')
+    return section, name, components.get(section, {}).get(name)
+
+
+def referenced_components(components, value):
+    """Return the subset of `components` referenced by `value`, transitively.
+
+    Sections and components keep their order in `components`.
+    """
+    wanted = {}
+    pending = find_refs(value)
+    seen = set()
+    while pending:
+        ref = pending.pop()
+        seen.add(ref)
+        section, name, component = get_component(components, ref)
+        if component is None:
+            continue
+        wanted.setdefault(section, set()).add(name)
+        pending.update(find_refs(component) - seen)
+
+    subset = OrderedDict()
+    for section, section_components in components.items():
+        names = wanted.get(section)
+        if names:
+            subset[section] = OrderedDict(
+                (name, component) for name, component in section_components.items() if name in names)
+    return subset
+
+
+def split_spec(spec):
+    """Split a document into one document per operation tag.
+
+    Operations with several tags are in each of their shards, those
+    without tags in the `UNTAGGED` one. Each shard carries only the
+    components its operations reference.
+
+    :param spec: Dict, as returned by `cornice_apispec.spec.build_spec`
+    :return: OrderedDict of tag name to shard dict
+    """
+    paths_by_tag = OrderedDict()
+    for path, path_item in spec.get('paths', {}).items():
+        # Path level members (parameters, summary...) go with every operation
+        common = OrderedDict((key, value) for key, value in path_item.items() if key not in HTTP_METHODS)
+        for method, operation in path_item.items():
+            if method not in HTTP_METHODS:
+                continue
+            for tag in operation.get('tags') or [UNTAGGED]:
+                tag_paths = paths_by_tag.setdefault(tag, OrderedDict())
+                if path not in tag_paths:
+                    tag_paths[path] = OrderedDict(common)
+                tag_paths[path][method] = operation
+
+    tags = dict((tag['name'], tag) for tag in spec.get('tags', []))
+    components = spec.get('components', {})
+    shards = OrderedDict()
+    for tag, paths in paths_by_tag.items():
+        shard = OrderedDict(
+            (key, value) for key, value in spec.items() if key not in ('paths', 'components', 'tags'))
+        shard['tags'] = [tags.get(tag, {'name': tag})]
+        shard['paths'] = paths
+        shard_components = referenced_components(components, paths)
+        if shard_components:
+            shard['components'] = shard_components
+        shards[tag] = shard
+    return shards
+
+
+class SpecShards(object):
+    """The per tag documents of an application, each one a `SpecDocument`."""
+
+    def __init__(self, spec, maxsize, compact=False):
+        self.tags = spec.get('tags', [])
+        self.documents = OrderedDict(
+            (tag, SpecDocument(shard, maxsize=maxsize, compact=compact)) for tag, shard in split_spec(spec).items())
+
+    def get(self, tag):
+        return self.documents.get(tag)
+
+    def index(self):
+        """List of `{'name', 'description'}` of every shard."""
+        descriptions = dict((tag['name'], tag.get('description', '')) for tag in self.tags)
+        return [{'name': tag, 'description': descriptions.get(tag, '')} for tag in self.documents]
+
+
+def get_spec_shards(registry, swagger_info, plugins, profiler=None):
+    """Return the cached `SpecShards` for these options, building them if needed.
+
+    The full document is built once (one pass over the introspector)
+    and split; `filter_by_tags` does not apply to shards.
+    """
+    cache = get_spec_cache(registry)
+    spec_key = spec_cache_key(swagger_info, plugins, False)
+
+    def build():
+        spec = load_or_build_spec(registry, swagger_info, plugins, profiler=profiler or get_profiler(registry),
+                                  fragments=get_route_fragments(registry, spec_key))
+        return SpecShards(spec, maxsize=cache.maxsize, compact=swagger_info.get('compact', False))
+
+    return cache.get_or_build(('shards',) + spec_key, build)
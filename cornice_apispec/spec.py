@@ -0,0 +1,91 @@
+from collections import OrderedDict
+
+from cornice_apispec.profiling import NULL_PROFILER
+
+
+def build_spec(registry, swagger_info, plugins, filter_by_tags=False, profiler=NULL_PROFILER, fragments=None,
+               workers=None):
+    """Build the OpenAPI document for every view registered in `registry`.
+
+    No request is needed, so this can run at configuration time.
+    The returned dict has no `servers` entry: it depends on the request
+    scheme and host (see `cornice_apispec.document.SpecDocument`).
+
+    :param registry: Pyramid Registry
+    :param swagger_info: Dict (see `cornice_apispec.generate_spec`)
+    :param plugins: APISpec Plugins list
+    :param filter_by_tags: Show only views with tags inside tag_list
+    :param profiler: `cornice_apispec.profiling.SpecProfiler` recording the build
+    :param fragments: Route fragments of a previous build with the same
+        options, to convert only new or changed routes
+        (see `cornice_apispec.paths.add_pyramid_routes`)
+    :param workers: Number of processes converting routes
+        (default: the `cornice_apispec.workers` setting, or none)
+    :return: Dict
+    """
+    # apispec, pyramid_apispec and YAML are imported on first build, not at boot
+    from apispec import APISpec
+
+    from cornice_apispec.paths import add_pyramid_routes
+
+    def check_tag(view):
+        if not filter_by_tags:
+            return True
+        view_tags = view['introspectable'].get('apispec_tags', [])
+        openapi_tags = [tag['name'] for tag in spec._tags]
+        if not view_tags:
+            return False
+        for tag in view_tags:
+            if tag in openapi_tags:
+                return True
+        return False
+
+    profiler.start()
+    spec = APISpec(
+        title=swagger_info.get('title', "OpenAPI Docs"),
+        version=swagger_info.get('version', '0.1.0'),
+        plugins=[plugin() for plugin in plugins],
+        openapi_version=swagger_info.get('openapi_version', '3.0.2')
+    )
+
+    for tag in swagger_info.get('tag_list', []):
+        spec.tag(tag)
+
+    # Group the documented views by route in a single pass: each route
+    # then walks its own views once, whatever its number of methods.
+    route_names = OrderedDict()
+    with profiler.phase('introspection'):
+        for view in registry.introspector.get_category('views', default=[]):
+            show_apispec = view['introspectable'].get('apispec_show', False) is True
+            has_request_methods = view['introspectable'].get('request_methods')
+            route_name = view['introspectable'].get('route_name')
+            has_tag = check_tag(view)
+            if show_apispec and has_request_methods and has_tag and route_name is not None:
+                route_names[route_name] = True
+
+    if workers is None:
+        workers = int((registry.settings or {}).get('cornice_apispec.workers', 0))
+    add_pyramid_routes(
+        spec, registry, route_names,
+        profiler=profiler,
+        fragments=fragments,
+        workers=workers,
+        show_head=swagger_info.get('show_head', False),
+        show_options=swagger_info.get('show_options', True),
+        compact=swagger_info.get('compact', False)
+    )
+
+    with profiler.phase('to_dict'):
+        openapi_spec = spec.to_dict()
+
+    main_description = swagger_info.get('main_description', "")
+    if main_description:
+        openapi_spec['info'].update({'description': main_description})
+
+    if swagger_info.get('dedupe_components', False):
+        from cornice_apispec.components import dedupe_components
+        with profiler.phase('components'):
+            openapi_spec = dedupe_components(openapi_spec)
+
+    profiler.finish()
+    return openapi_spec
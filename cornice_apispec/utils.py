@@ -1,28 +1,84 @@
 import inspect
 import hashlib
+import logging
+import weakref
+
+logger = logging.getLogger(__name__)
+
+# Schema instance: component name
+_instance_names = weakref.WeakKeyDictionary()
+# APISpec: {component name: schema identity}
+_spec_schemas = weakref.WeakKeyDictionary()
 
 
 def get_schema_name(schema):
     if inspect.isclass(schema):
         return schema.__name__
-    else:
+    try:
+        return _instance_names[schema]
+    except KeyError:
+        name = _instance_names[schema] = _get_instance_name(schema)
+        return name
+    except TypeError:  # not weak referenceable
+        return _get_instance_name(schema)
+
+
+def _option(schema, name):
+    value = getattr(schema, name, None)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(sorted(value))
+    return value or None
+
 
-        if hasattr(schema, '__apispec__') and schema.__apispec__.get('model'):
-            return schema.__apispec__.get('model')
+def schema_identity(schema):
+    """Return what makes the component of `schema`: its class and instance options."""
+    if inspect.isclass(schema):
+        return (schema,)
+    return (schema.__class__, _option(schema, 'only'), _option(schema, 'exclude'),
+            bool(getattr(schema, 'many', False)), _option(schema, 'partial'))
+
+
+def _get_instance_name(schema):
+    if hasattr(schema, '__apispec__') and schema.__apispec__.get('model'):
+        return schema.__apispec__.get('model')
 
-        if 'exclude' in schema.__dict__:
-            key = "{}".format(list(schema.__dict__.get('exclude'))).encode('utf-8')
+    if 'exclude' in schema.__dict__:
+        key = "{}".format(list(schema.__dict__.get('exclude')))
+        # `only` and `partial` change the fields too
+        options = [(name, _option(schema, name)) for name in ('only', 'partial') if _option(schema, name)]
+        if options:
+            key = "{} {}".format(key, options)
+        key = key.encode('utf-8')
 
-            return "{}-{}".format(schema.__class__.__name__, hashlib.md5(key).hexdigest()[:5])
-        else:
-            return schema.__class__.__name__
+        return "{}-{}".format(schema.__class__.__name__, hashlib.md5(key).hexdigest()[:5])
+    else:
+        return schema.__class__.__name__
 
 
 def add_schema_in_spec(spec, schema):
+    """Add `schema` to the spec components, once per name.
+
+    A schema of another class, or with other instance options (see
+    `schema_identity`), resolving to an already registered name is not
+    added: a warning is logged instead.
+    """
     from apispec.exceptions import DuplicateComponentNameError
 
-    if not isinstance(schema, str):
-        try:
-            spec.components.schema(get_schema_name(schema), schema=schema)
-        except DuplicateComponentNameError:
-            pass
+    if isinstance(schema, str):
+        return
+    name = get_schema_name(schema)
+    identity = schema_identity(schema)
+    registered = _spec_schemas.setdefault(spec, {})
+    registered_identity = registered.get(name)
+    if registered_identity is not None:
+        if registered_identity != identity:
+            logger.warning('Schema component name %r is used by %r and %r: only the first one is documented',
+                           name, registered_identity, identity)
+        return
+
+    registered[name] = identity
+    try:
+        spec.components.schema(name, schema=schema)
+    except DuplicateComponentNameError:
+        # already added, e.g. as a nested schema by the MarshmallowPlugin
+        pass
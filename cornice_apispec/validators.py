@@ -1,33 +1,198 @@
-from cornice.validators import colander_body_validator, colander_headers_validator, colander_path_validator, \
-    colander_querystring_validator, colander_validator, marshmallow_body_validator, marshmallow_headers_validator, \
-    marshmallow_path_validator, marshmallow_querystring_validator, marshmallow_validator
+"""Cornice validators documented by `AutoDoc`.
 
-apispec_marshmallow_validator = marshmallow_validator
-setattr(apispec_marshmallow_validator, 'location', 'all')
+The location of a validator, the part of the request its schema
+validates, is kept in a registry read by `AutoDoc.find_schema_for`:
+Cornice's own validators are registered too, but never modified.
 
-apispec_marshmallow_body_validator = marshmallow_body_validator
-setattr(apispec_marshmallow_body_validator, 'location', 'body')
+The marshmallow validators build their schemas once per (schema,
+location, options) instead of once per request, as Cornice's do.
+Schemas keep the request in their `context` while loading, so each
+thread has its own instances.
+"""
+import copy
+import threading
+import weakref
 
-apispec_marshmallow_headers_validator = marshmallow_headers_validator
-setattr(apispec_marshmallow_headers_validator, 'location', 'headers')
+import marshmallow
+from cornice import validators as cornice_validators
+from cornice.validators import extract_cstruct
+from cornice.validators._marshmallow import _message_normalizer
 
-apispec_marshmallow_path_validator = marshmallow_path_validator
-setattr(apispec_marshmallow_path_validator, 'location', 'path')
+# marshmallow 3 renamed `load_from`
+LOAD_FROM = 'load_from' if marshmallow.__version__.startswith('2.') else 'data_key'
 
-apispec_marshmallow_querystring_validator = marshmallow_querystring_validator
-setattr(apispec_marshmallow_querystring_validator, 'location', 'querystring')
+# marshmallow 3 raises on unknown fields unless told otherwise
+EXCLUDE = getattr(marshmallow, 'EXCLUDE', 'exclude')
 
-apispec_colander_validator = colander_validator
-setattr(apispec_colander_validator, 'location', 'all')
+# Validator location: key of the `extract_cstruct` data
+CSTRUCT_KEYS = {
+    'body': 'body',
+    'headers': 'header',
+    'path': 'path',
+    'querystring': 'querystring',
+}
 
-apispec_colander_body_validator = colander_body_validator
-setattr(apispec_colander_body_validator, 'location', 'body')
+_local = threading.local()
 
-apispec_colander_headers_validator = colander_headers_validator
-setattr(apispec_colander_headers_validator, 'location', 'headers')
+# Validator: location
+_locations = weakref.WeakKeyDictionary()
 
-apispec_colander_path_validator = colander_path_validator
-setattr(apispec_colander_path_validator, 'location', 'path')
 
-apispec_colander_querystring_validator = colander_querystring_validator
-setattr(apispec_colander_querystring_validator, 'location', 'querystring')
+def register_validator_location(validator, location):
+    """Document the schema of the views validated by `validator` at `location`.
+
+    :param validator: Cornice validator
+    :param location: 'body', 'headers', 'path', 'querystring' or 'all'
+    """
+    _locations[validator] = location
+
+
+def get_validator_location(validator):
+    """Return the registered location of `validator`, or None.
+
+    Validators with a `location` attribute are supported as well.
+    """
+    try:
+        location = _locations.get(validator)
+    except TypeError:  # not weak referenceable
+        location = None
+    if location is None:
+        location = getattr(validator, '__dict__', {}).get('location')
+    return location
+
+
+class ValidatedField(marshmallow.fields.Field):
+    """Field loaded with the `inner` schema instance."""
+
+    def __init__(self, inner, **kwargs):
+        super(ValidatedField, self).__init__(**kwargs)
+        self.inner = inner
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        return load(self.inner, value)
+
+
+def load(schema, data):
+    """`schema.load`, raising `ValidationError` with marshmallow 2 too."""
+    deserialized = schema.load(data)
+    # marshmallow 2 returns (data, errors), 3 raises
+    if isinstance(deserialized, tuple):
+        deserialized, errors = deserialized
+        if errors:
+            raise marshmallow.ValidationError(errors)
+    return deserialized
+
+
+def make_request_schema(location, inner):
+    """Schema of the request data, loading its `location` member with `inner`."""
+    class Meta(object):
+        strict = True
+        ordered = True
+        unknown = EXCLUDE
+
+    key = CSTRUCT_KEYS[location]
+    attrs = {key: ValidatedField(inner, required=True, **{LOAD_FROM: key}), 'Meta': Meta}
+    return type('RequestSchema', (marshmallow.Schema,), attrs)()
+
+
+def get_schemas(schema, location='all', **options):
+    """Return the schema instances validating `location` for this thread.
+
+    :param schema: marshmallow Schema class, or instance (copied once)
+    :param location: Validated part of the request, or 'all'
+    :param options: Schema class arguments (e.g. `partial=True`)
+    :return: Tuple of the `schema` instance and of the schema loading
+        the request data with it (`schema` itself for 'all')
+    """
+    cache = getattr(_local, 'schemas', None)
+    if cache is None:
+        cache = _local.schemas = {}
+    key = (schema, location, repr(sorted(options.items())))
+    schemas = cache.get(key)
+    if schemas is None:
+        instance = schema(**options) if isinstance(schema, type) else copy.deepcopy(schema)
+        request_schema = instance
+        if location != 'all':
+            request_schema = make_request_schema(location, instance)
+            # schemas copy their fields, and the field its `inner` schema
+            instance = request_schema.fields[CSTRUCT_KEYS[location]].inner
+        schemas = cache[key] = (instance, request_schema)
+    return schemas
+
+
+def clear_schemas():
+    """Drop the schema instances of this thread."""
+    _local.schemas = {}
+
+
+def _validate(request, schema, cstruct):
+    # As `cornice.validators.marshmallow_validator` reports errors
+    try:
+        deserialized = load(schema, cstruct)
+    except marshmallow.ValidationError as error:
+        for location, details in _message_normalizer(error).items():
+            location = location if location != '_schema' else ''
+            if hasattr(details, 'items'):
+                for subfield, msg in details.items():
+                    request.errors.add(location, subfield, msg)
+            else:
+                request.errors.add(location, location, details)
+    else:
+        request.validated.update(deserialized)
+
+
+def marshmallow_validator_for(location, **options):
+    """Return a Cornice validator of `location` with cached schema instances.
+
+    Example::
+
+        @service.patch(schema=UserSchema, validators=(marshmallow_validator_for('body', partial=True),))
+
+    :param location: 'body', 'headers', 'path', 'querystring' or 'all'
+    :param options: Schema class arguments
+    """
+    def validator(request, schema=None, deserializer=None, **kwargs):
+        if schema is None:
+            return
+        instance, request_schema = get_schemas(schema, location, **options)
+        cstruct = (deserializer or extract_cstruct)(request)
+        # The same dicts: nested schemas hold a reference to them
+        instance.context['request'] = request_schema.context['request'] = request
+        try:
+            _validate(request, request_schema, cstruct)
+        finally:
+            instance.context.pop('request', None)
+            request_schema.context.pop('request', None)
+        if location != 'all':
+            request.validated = request.validated.get(CSTRUCT_KEYS[location], {})
+
+    register_validator_location(validator, location)
+    return validator
+
+
+apispec_marshmallow_validator = marshmallow_validator_for('all')
+
+apispec_marshmallow_body_validator = marshmallow_validator_for('body')
+
+apispec_marshmallow_headers_validator = marshmallow_validator_for('headers')
+
+apispec_marshmallow_path_validator = marshmallow_validator_for('path')
+
+apispec_marshmallow_querystring_validator = marshmallow_validator_for('querystring')
+
+# The colander validators import colander when first called
+apispec_colander_validator = cornice_validators.colander_validator
+
+apispec_colander_body_validator = cornice_validators.colander_body_validator
+
+apispec_colander_headers_validator = cornice_validators.colander_headers_validator
+
+apispec_colander_path_validator = cornice_validators.colander_path_validator
+
+apispec_colander_querystring_validator = cornice_validators.colander_querystring_validator
+
+for _location in ('body', 'headers', 'path', 'querystring'):
+    register_validator_location(getattr(cornice_validators, 'colander_{}_validator'.format(_location)), _location)
+    register_validator_location(getattr(cornice_validators, 'marshmallow_{}_validator'.format(_location)), _location)
+register_validator_location(cornice_validators.colander_validator, 'all')
+register_validator_location(cornice_validators.marshmallow_validator, 'all')
@@ -0,0 +1,290 @@
+from pyramid.httpexceptions import HTTPNotFound, HTTPNotModified
+from pyramid.response import Response
+from pyramid.settings import asbool
+
+from cornice_apispec.document import (
+    CONTENT_ENCODINGS, STREAM_CONTENT_ENCODINGS, get_prebuilt_document, get_server_url, get_spec_document
+)
+from cornice_apispec.serializers import CONTENT_TYPES, MEDIA_TYPES
+from cornice_apispec.shards import get_spec_shards
+from cornice_apispec.warmup import wait_for_warm_up
+
+# Pyramid runs actions by ascending order, and the default order is 0:
+# building the spec after every other action sees all routes and views.
+EAGER_BUILD_ORDER = 1000
+
+# Route added by `add_spec_view` next to the `openapi_spec` one of `includeme`
+YAML_ROUTE_NAME = 'openapi_spec_yaml'
+YAML_ROUTE_PATH = '/openapi.yaml'
+
+
+class SpecView(object):
+    """Serve the cached OpenAPI document as pre-serialized JSON or YAML.
+
+    The format is negotiated with the `Accept` header, `output_format`
+    being served by default. Each format is serialized once per server
+    URL and kept.
+
+    Responses carry a strong `ETag` and `Last-Modified`, so polling
+    clients get a `304 Not Modified` while the document is unchanged.
+    Clients accepting gzip (or brotli, when installed) get a body
+    compressed once and kept next to the plain one.
+
+    With `prebuilt_path`, the document is read from that file
+    (see `cornice-apispec-build`) instead of being built.
+
+    With `stream`, JSON bodies are not kept: every response serializes
+    the document path by path (and gzips it) while it is sent.
+    """
+
+    def __init__(self, swagger_info, plugins, filter_by_tags=False, prebuilt_path=None, stream=False,
+                 output_format='json'):
+        self.swagger_info = swagger_info
+        self.plugins = plugins
+        self.filter_by_tags = filter_by_tags
+        self.prebuilt_path = prebuilt_path
+        self.stream = stream
+        self.output_format = output_format
+
+    def get_document(self, registry):
+        if self.prebuilt_path:
+            return get_prebuilt_document(registry, self.prebuilt_path,
+                                         compact=self.swagger_info.get('compact', False))
+        return get_spec_document(registry, self.swagger_info, self.plugins, filter_by_tags=self.filter_by_tags)
+
+    def prepare(self, registry):
+        """Build (and cache) the served document ahead of the first request."""
+        self.get_document(registry)
+
+    def warm_up(self, request):
+        """Build the document and serialize it for the server URL of `request`."""
+        variant = self.get_document(request.registry).variant(get_server_url(request, self.swagger_info))
+        if self.stream and self.output_format == 'json':
+            variant.stream_etag()
+        else:
+            variant.get_etag(output_format=self.output_format)
+
+    def __call__(self, request):
+        wait_for_warm_up(request.registry)
+        return self.respond(request, self.get_document(request.registry))
+
+    def respond(self, request, document):
+        variant = document.variant(get_server_url(request, self.swagger_info))
+        output_format = choose_format(request, self.output_format)
+        # YAML is not streamed
+        stream = self.stream and output_format == 'json'
+        if stream:
+            encoding = choose_encoding(request, STREAM_CONTENT_ENCODINGS)
+            # hashes the body chunk by chunk, so `get_etag` does not keep it
+            variant.stream_etag()
+        else:
+            encoding = choose_encoding(request)
+        etag = variant.get_etag(encoding, output_format)
+        if is_not_modified(request, etag, document.last_modified):
+            response = HTTPNotModified()
+        else:
+            content_type = CONTENT_TYPES[output_format]
+            if stream:
+                response = Response(app_iter=variant.iter_body(encoding), content_type=content_type,
+                                    charset='utf-8')
+            else:
+                response = Response(body=variant.get_body(encoding, output_format), content_type=content_type,
+                                    charset='utf-8')
+            if encoding != 'identity':
+                response.content_encoding = encoding
+        response.etag = etag
+        response.last_modified = document.last_modified
+        response.vary = ('Accept', 'Accept-Encoding')
+        return response
+
+
+class SpecShardView(SpecView):
+    """Serve the document of the tag in the `tag` matchdict entry."""
+
+    def get_shards(self, registry):
+        return get_spec_shards(registry, self.swagger_info, self.plugins)
+
+    def prepare(self, registry):
+        self.get_shards(registry)
+
+    def __call__(self, request):
+        document = self.get_shards(request.registry).get(request.matchdict['tag'])
+        if document is None:
+            raise HTTPNotFound()
+        return self.respond(request, document)
+
+
+class SpecShardIndexView(object):
+    """List the shards served by `shard_view` at `shard_route_name`.
+
+    The `urls` member has the format of the Swagger UI `urls` option.
+    """
+
+    def __init__(self, shard_view, shard_route_name):
+        self.shard_view = shard_view
+        self.shard_route_name = shard_route_name
+
+    def __call__(self, request):
+        shards = self.shard_view.get_shards(request.registry)
+        index = shards.index()
+        for shard in index:
+            shard['url'] = request.route_url(self.shard_route_name, tag=shard['name'])
+        response = Response(json_body={'urls': index}, charset='utf-8')
+        response.md5_etag()
+        response.conditional_response = True
+        return response
+
+
+def choose_encoding(request, encodings=CONTENT_ENCODINGS):
+    if 'Accept-Encoding' not in request.headers:
+        return 'identity'
+    offers = request.accept_encoding.acceptable_offers(encodings)
+    return offers[0][0] if offers else 'identity'
+
+
+def choose_format(request, default='json'):
+    """Format of the preferred media type `request` accepts, `default` on ties."""
+    if 'Accept' not in request.headers:
+        return default
+    # stable sort: the media types of `default` first
+    media_types = sorted(MEDIA_TYPES, key=lambda media_type: MEDIA_TYPES[media_type] != default)
+    offers = request.accept.acceptable_offers(media_types)
+    return MEDIA_TYPES[offers[0][0]] if offers else default
+
+
+def is_not_modified(request, etag, last_modified):
+    # If-None-Match takes precedence over If-Modified-Since (RFC 7232)
+    if request.if_none_match:
+        return etag in request.if_none_match
+    if request.if_modified_since is not None:
+        return request.if_modified_since.replace(tzinfo=None) >= last_modified
+    return False
+
+
+def add_spec_view(config, swagger_info=None, plugins=None, filter_by_tags=False,
+                  route_name='openapi_spec', route_path=None, eager=None, prebuilt_path=None, stream=None,
+                  yaml_route_name=None, yaml_route_path=None, compact=None, **view_args):
+    """Pyramid directive serving the OpenAPI document at `route_name`.
+
+    Available as `config.cornice_apispec_add_spec_view(...)`. The route
+    is the one added by `includeme`, unless `route_path` is given.
+
+    The document is served as JSON or YAML, as negotiated with the
+    `Accept` header. It is also served, as YAML by default, at
+    `yaml_route_name`: by default, when `route_name` is the
+    `/openapi.json` route added by `includeme`, an `/openapi.yaml` route
+    added here.
+
+    With `eager` (or the `cornice_apispec.eager` setting) the document
+    is built at the end of `config.commit()`, so no request pays for
+    the introspection. Without it, the first request builds it.
+
+    With `prebuilt_path` (or the `cornice_apispec.prebuilt_path` setting)
+    the document is read from a file written by `cornice-apispec-build`
+    and the application views are not introspected at all.
+
+    With `stream` (or the `cornice_apispec.stream` setting) response
+    bodies are serialized while they are sent, path by path, instead of
+    being kept in memory: for documents with thousands of operations.
+
+    With `compact` (or the `cornice_apispec.compact` setting) optional
+    members are left out of the document, and JSON has no whitespace
+    (see `cornice_apispec.generate_spec`).
+
+    :param config: Pyramid Configurator
+    :param swagger_info: Dict (see `cornice_apispec.generate_spec`)
+    :param plugins: APISpec Plugins list (default: MarshmallowPlugin)
+    :param filter_by_tags: Show only views with tags inside tag_list
+    :param route_name: Route serving the document
+    :param route_path: Add the route with this pattern
+    :param eager: Build the document when configuration is committed
+    :param prebuilt_path: Serve the spec file at this path
+    :param stream: Stream response bodies instead of keeping them
+    :param yaml_route_name: Route serving the document as YAML by default
+    :param yaml_route_path: Add the YAML route with this pattern
+    :param compact: Serve a smaller document
+    :param view_args: Additional `add_view` arguments (e.g. permission)
+    """
+    settings = config.registry.settings
+    if plugins is None:
+        from apispec.ext.marshmallow import MarshmallowPlugin
+        plugins = [MarshmallowPlugin]
+    if eager is None:
+        eager = asbool(settings.get('cornice_apispec.eager', False))
+    if prebuilt_path is None:
+        prebuilt_path = settings.get('cornice_apispec.prebuilt_path')
+    if stream is None:
+        stream = asbool(settings.get('cornice_apispec.stream', False))
+    if compact is None:
+        compact = asbool(settings.get('cornice_apispec.compact', False))
+    swagger_info = swagger_info or {}
+    if compact:
+        swagger_info = dict(swagger_info, compact=True)
+    if (yaml_route_name is None and route_name == 'openapi_spec' and route_path is None and
+            settings.get("auto_generate.swagger.view", True) is True):
+        yaml_route_name = YAML_ROUTE_NAME
+        if yaml_route_path is None:
+            yaml_route_path = YAML_ROUTE_PATH
+
+    spec_views = {}
+    for name, path, output_format in ((route_name, route_path, 'json'),
+                                      (yaml_route_name, yaml_route_path, 'yaml')):
+        if name is None:
+            continue
+        spec_view = spec_views[name] = SpecView(swagger_info, plugins, filter_by_tags=filter_by_tags,
+                                                prebuilt_path=prebuilt_path, stream=stream,
+                                                output_format=output_format)
+        if path is not None:
+            config.add_route(name, path)
+        config.add_view(spec_view, route_name=name, **view_args)
+
+    def register():
+        registry = config.registry
+        if not hasattr(registry, 'cornice_apispec_views'):
+            registry.cornice_apispec_views = {}
+        registry.cornice_apispec_views.update(spec_views)
+        if eager:
+            # both views share the cached document
+            spec_views[route_name].prepare(registry)
+
+    config.action(('cornice_apispec_spec_view', route_name), register, order=EAGER_BUILD_ORDER)
+
+
+def add_spec_shard_views(config, swagger_info=None, plugins=None,
+                         route_name='openapi_shard', route_path='/openapi/{tag}.json',
+                         index_route_name='openapi_shard_index', index_route_path='/openapi/index.json',
+                         eager=None, **view_args):
+    """Pyramid directive serving one OpenAPI document per tag.
+
+    Available as `config.cornice_apispec_add_spec_shard_views(...)`.
+    Each shard has the operations of one tag and the components they
+    reference, at `route_path`; the index at `index_route_path` lists
+    them. Shards are served and cached like the whole document (see
+    `add_spec_view`). The index route is added first, so it hides a
+    shard of the same name.
+
+    :param config: Pyramid Configurator
+    :param swagger_info: Dict (see `cornice_apispec.generate_spec`)
+    :param plugins: APISpec Plugins list (default: MarshmallowPlugin)
+    :param route_name: Route serving the shards, with a `tag` placeholder
+    :param route_path: Pattern of `route_name`
+    :param index_route_name: Route serving the index
+    :param index_route_path: Pattern of `index_route_name`
+    :param eager: Build the shards when configuration is committed
+    :param view_args: Additional `add_view` arguments (e.g. permission)
+    """
+    if plugins is None:
+        from apispec.ext.marshmallow import MarshmallowPlugin
+        plugins = [MarshmallowPlugin]
+    if eager is None:
+        eager = asbool(config.registry.settings.get('cornice_apispec.eager', False))
+
+    shard_view = SpecShardView(swagger_info or {}, plugins)
+    config.add_route(index_route_name, index_route_path)
+    config.add_route(route_name, route_path)
+    config.add_view(SpecShardIndexView(shard_view, route_name), route_name=index_route_name, **view_args)
+    config.add_view(shard_view, route_name=route_name, **view_args)
+
+    if eager:
+        config.action(('cornice_apispec_spec_shard_view', route_name),
+                      lambda: shard_view.prepare(config.registry), order=EAGER_BUILD_ORDER)
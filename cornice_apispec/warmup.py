@@ -0,0 +1,103 @@
+"""Build the served documents in the background once the app is created.
+
+Enabled by the `cornice_apispec.warmup` setting. When the WSGI app is
+created (and again in forked worker processes, when the fork
+interrupted it) a daemon thread builds the document of every spec
+view, and serializes it for the `cornice_apispec.warmup_scheme` and
+`cornice_apispec.warmup_host` settings. Spec view requests arriving
+meanwhile wait for it instead of building the document themselves.
+"""
+import logging
+import os
+import threading
+import weakref
+
+from concurrent.futures import Future
+from pyramid.request import Request
+
+from cornice_apispec import cache, workers
+
+logger = logging.getLogger(__name__)
+
+# Registries whose warm-up must be restarted in forked processes,
+# by id: registries are dicts, so they are not hashable
+_registries = weakref.WeakValueDictionary()
+
+
+def get_warm_up_request(registry):
+    """Synthetic request for the configured scheme and host."""
+    settings = registry.settings or {}
+    host = settings.get('cornice_apispec.warmup_host', 'localhost:80')
+    request = Request.blank('/', base_url='{}://{}'.format(
+        settings.get('cornice_apispec.warmup_scheme', 'http'), host))
+    # The Host header as clients send it: `blank` adds the default port
+    request.host = host
+    request.registry = registry
+    return request
+
+
+def warm_up(registry):
+    """Build and serialize the document of every spec view, synchronously."""
+    request = get_warm_up_request(registry)
+    for spec_view in getattr(registry, 'cornice_apispec_views', {}).values():
+        spec_view.warm_up(request)
+
+
+def _run(registry, future):
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        warm_up(registry)
+    except Exception as error:
+        logger.exception('OpenAPI spec warm-up failed')
+        future.set_exception(error)
+    else:
+        future.set_result(None)
+
+
+def start_warm_up(registry):
+    """Start `warm_up` on a daemon thread; return its future."""
+    future = registry.cornice_apispec_warmup = Future()
+    _registries[id(registry)] = registry
+    thread = threading.Thread(target=_run, args=(registry, future), name='cornice-apispec-warmup')
+    thread.daemon = True
+    thread.start()
+    return future
+
+
+def wait_for_warm_up(registry, timeout=None):
+    """Block until a running warm-up of `registry` is over, or `timeout` seconds.
+
+    `timeout` defaults to the `cornice_apispec.wait_timeout` setting.
+    """
+    future = getattr(registry, 'cornice_apispec_warmup', None)
+    if future is None or future.done():
+        return
+    if timeout is None:
+        timeout = float((registry.settings or {}).get('cornice_apispec.wait_timeout', cache.DEFAULT_WAIT_TIMEOUT))
+    try:
+        future.result(timeout)
+    except Exception:
+        # Failures are logged by the warm-up thread, and a late warm-up
+        # is not waited for: the caller builds the document itself
+        pass
+
+
+def on_application_created(event):
+    start_warm_up(event.app.registry)
+
+
+def _after_fork_in_child():
+    # Threads do not survive a fork: restart the warm-ups it interrupted.
+    # `cache` resets the caches first, so their builds in flight are abandoned.
+    if workers.in_worker():
+        # a process converting routes for a build, not a server
+        return
+    for registry in list(_registries.values()):
+        future = getattr(registry, 'cornice_apispec_warmup', None)
+        if future is not None and not future.done():
+            start_warm_up(registry)
+
+
+if hasattr(os, 'register_at_fork'):  # Python 3.7+
+    os.register_at_fork(after_in_child=_after_fork_in_child)
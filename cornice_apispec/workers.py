@@ -0,0 +1,123 @@
+"""Routes converted by a pool of forked worker processes.
+
+Enabled by the `cornice_apispec.workers` setting, or the `workers`
+argument of `build_spec`. Workers are forked from the building process,
+so they inherit its registry: they receive route names and send back
+operations, which are plain dicts, and their schemas as references to
+objects of the building process. Routes whose schemas cannot be
+referenced, e.g. instances created by a lambda, are converted by the
+building process, as without workers.
+
+Conversion is pure Python: processes scale it with cores, threads do not
+under the GIL. Forking and sending results back cost more than converting
+a few routes, so only large applications on several cores gain from it.
+Without `os.fork` (e.g. on Windows), routes are converted serially.
+"""
+import inspect
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Registry, conversion arguments and shared schemas of the build being
+# forked: set in the building process, inherited by its workers
+_state = {}
+_state_lock = threading.Lock()
+
+
+def in_worker():
+    """Return True in a worker process, or while its pool is forked."""
+    return bool(_state)
+
+
+def shared_schemas(registry):
+    """Return the schemas workers can refer to, and their index by `id`.
+
+    The schemas of the marshmallow class registry, of `apispec_response_schemas`
+    and of Cornice service definitions, with their nested schemas: objects
+    created before forking, which have the same `id` in workers.
+    """
+    from cornice.util import to_list
+    from marshmallow import class_registry
+
+    schemas = []
+    for classes in class_registry._registry.values():
+        schemas.extend(classes)
+    for view in registry.introspector.get_category('views', default=[]):
+        schemas.extend((view['introspectable'].get('apispec_response_schemas') or {}).values())
+    for service in getattr(registry, 'cornice_services', {}).values():
+        for _, _, args in service.definitions:
+            schemas.extend(schema for schema in to_list(args.get('schema')) if schema is not None)
+    for schema in list(schemas):
+        schema_class = schema if inspect.isclass(schema) else type(schema)
+        for field in getattr(schema_class, '_declared_fields', {}).values():
+            nested = getattr(field, 'nested', None)
+            if nested is not None and not isinstance(nested, str):
+                schemas.append(nested)
+    # the list keeps every schema alive, so no other object gets its id
+    return schemas, dict((id(schema), index) for index, schema in enumerate(schemas))
+
+
+def _convert(route_name):
+    from cornice_apispec.paths import get_route_operations
+
+    registry, kwargs, indexes = _state['registry'], _state['kwargs'], _state['indexes']
+    route = registry.introspector.get('routes', route_name)
+    route_operations, schemas = get_route_operations(registry, route, **kwargs)
+    references = []
+    for schema in schemas:
+        if isinstance(schema, str):
+            references.append(schema)
+        elif id(schema) in indexes:
+            references.append(indexes[id(schema)])
+        else:
+            # created in this process: the building process converts the route
+            return route_name, None
+    return route_name, (route_operations, references)
+
+
+def convert_routes(registry, route_names, workers, **kwargs):
+    """Convert `route_names` with `workers` forked processes.
+
+    :param registry: Pyramid Registry
+    :param route_names: Route names to convert
+    :param workers: Number of worker processes
+    :param kwargs: `get_route_operations` arguments
+    :return: Dict of route name: (operations, schemas), without the
+        routes workers could not convert
+    """
+    if not hasattr(os, 'fork'):
+        return {}
+    import multiprocessing
+    try:
+        # Python 3.14 no longer forks by default
+        context = multiprocessing.get_context('fork')
+    except AttributeError:  # Python 2 always forks
+        context = multiprocessing
+
+    schemas, indexes = shared_schemas(registry)
+    converted = {}
+    # one build at a time: workers read `_state` of their own build
+    with _state_lock:
+        _state.update(registry=registry, kwargs=kwargs, indexes=indexes)
+        pool = None
+        try:
+            pool = context.Pool(workers)
+            chunksize = max(1, len(route_names) // (workers * 4))
+            for route_name, result in pool.imap(_convert, route_names, chunksize):
+                if result is not None:
+                    route_operations, references = result
+                    converted[route_name] = (route_operations, [
+                        schemas[reference] if isinstance(reference, int) else reference
+                        for reference in references])
+            pool.close()
+        except Exception:
+            logger.exception('OpenAPI spec workers failed: converting the routes serially')
+            converted = {}
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+            _state.clear()
+    return converted
@@ -0,0 +1,59 @@
+import marshmallow
+import pytest
+from apispec.ext.marshmallow import MarshmallowPlugin
+from pyramid.config import Configurator
+from webtest import TestApp
+from cornice import Service
+
+from cornice_apispec.validators import apispec_marshmallow_querystring_validator
+
+swagger_info = {
+    'title': "My API",
+    'version': "1.0.0",
+    'show_head': False,
+}
+plugins = [MarshmallowPlugin]
+
+
+class SearchSchema(marshmallow.Schema):
+    """Search the items."""
+
+    q = marshmallow.fields.String(required=True)
+    page = marshmallow.fields.Integer(description='Page number')
+
+
+class ItemSchema(marshmallow.Schema):
+    name = marshmallow.fields.String()
+
+
+items = Service(name='items', path='/items/{id}', apispec_show=True,
+                apispec_response_schemas={200: ItemSchema, 404: 'Not Found'})
+
+
+@items.get(schema=SearchSchema, validators=(apispec_marshmallow_querystring_validator,))
+def search_items(request):
+    return []
+
+
+def main(global_config, **settings):
+
+    config = Configurator(settings=settings)
+
+    config.include('cornice')
+    config.include('cornice_apispec')
+
+    config.cornice_apispec_add_spec_view(swagger_info=swagger_info, plugins=plugins)
+
+    config.scan(exclude=['tests'])
+
+    return config.make_wsgi_app()
+
+
+@pytest.fixture
+def app():
+    return TestApp(main({}, **{'cornice_apispec.compact': 'true'}))
+
+
+@pytest.fixture
+def full_app():
+    return TestApp(main({}))
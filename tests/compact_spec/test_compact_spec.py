@@ -0,0 +1,63 @@
+import json
+
+from pyramid.request import Request
+from webtest import TestApp
+
+from cornice_apispec import generate_spec
+
+from .conftest import main, plugins, swagger_info
+
+
+def make_spec(app, compact):
+    request = Request.blank('/')
+    request.registry = app.app.registry
+    return generate_spec(request, swagger_info, plugins, use_cache=False, compact=compact)
+
+
+def test_optional_members_left_out(full_app):
+    operation = make_spec(full_app, compact=True)['paths']['/items/{id}']['get']
+
+    assert operation['parameters'] == [
+        {'name': 'id', 'in': 'path', 'required': True, 'schema': {'type': 'string'}, 'description': 'id parameter'},
+        {'name': 'q', 'in': 'query', 'required': True, 'schema': {'type': 'string'}},
+        {'name': 'page', 'in': 'query', 'schema': {'type': 'integer'}, 'description': 'Page number'},
+    ]
+    # the description of a response is required, even empty
+    assert operation['responses'] == {
+        '200': {'description': '', 'content': {'text/plain': {'schema': {'$ref': '#/components/schemas/ItemSchema'}}}},
+        '404': {'description': 'Not Found'},
+    }
+
+
+def test_full_document_unchanged(full_app):
+    operation = make_spec(full_app, compact=False)['paths']['/items/{id}']['get']
+
+    assert operation['parameters'][1]['description'] == 'Search the items.'
+    assert operation['parameters'][2]['required'] is False
+    assert operation['responses']['404'] == {'description': 'Not Found', 'content': {}}
+
+
+def test_view_serves_minified_json(app, full_app):
+    response = app.get('/openapi.json')
+    full = full_app.get('/openapi.json')
+
+    assert response.body == json.dumps(response.json, separators=(',', ':')).encode('utf-8')
+    assert len(response.body) < len(full.body)
+    assert response.json['paths']['/items/{id}']['get']['responses']['404'] == {'description': 'Not Found'}
+
+
+def test_streamed_body_is_the_same(app):
+    streamed = TestApp(main({}, **{'cornice_apispec.compact': 'true', 'cornice_apispec.stream': 'true'}))
+
+    assert streamed.get('/openapi.json').body == app.get('/openapi.json').body
+
+
+def test_compact_documents_cached_apart(full_app):
+    request = Request.blank('/')
+    request.registry = full_app.app.registry
+
+    compact = generate_spec(request, swagger_info, plugins, compact=True)
+    full = generate_spec(request, swagger_info, plugins)
+
+    assert compact != full
+    assert generate_spec(request, swagger_info, plugins, compact=True)['paths'] is compact['paths']
@@ -0,0 +1,67 @@
+import marshmallow
+import pytest
+from apispec.ext.marshmallow import MarshmallowPlugin
+from pyramid.config import Configurator
+from webtest import TestApp
+from cornice import Service
+
+from cornice_apispec.validators import apispec_marshmallow_headers_validator
+
+swagger_info = {
+    'title': "My API",
+    'version': "1.0.0",
+    'show_head': False,
+    'dedupe_components': True,
+}
+plugins = [MarshmallowPlugin]
+
+
+class RequestHeaders(marshmallow.Schema):
+    """Request headers."""
+
+    request_id = marshmallow.fields.String(load_from='X-Request-Id')
+
+
+class UserSchema(marshmallow.Schema):
+    """User."""
+
+    name = marshmallow.fields.String(required=True)
+
+
+response_schemas = {200: UserSchema, 404: 'Not Found'}
+
+user = Service(name='user', path='/users/{id}', apispec_show=True, apispec_response_schemas=response_schemas)
+item = Service(name='item', path='/items/{id}', apispec_show=True, apispec_response_schemas={404: 'Not Found'})
+
+
+@user.get(schema=RequestHeaders, validators=(apispec_marshmallow_headers_validator,))
+def get_user(request):
+    return {'name': 'Name'}
+
+
+@user.delete(schema=RequestHeaders, validators=(apispec_marshmallow_headers_validator,))
+def delete_user(request):
+    return {}
+
+
+@item.get(schema=RequestHeaders, validators=(apispec_marshmallow_headers_validator,),
+          apispec_response_schemas={200: 'The item'})
+def get_item(request):
+    return {}
+
+
+def main(global_config, **settings):
+
+    config = Configurator(settings=settings)
+
+    config.include('cornice')
+    config.include('cornice_apispec')
+
+    config.scan(exclude=['tests'])
+
+    return config.make_wsgi_app()
+
+
+@pytest.fixture
+def app():
+    return TestApp(main({}))
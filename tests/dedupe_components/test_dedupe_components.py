@@ -0,0 +1,82 @@
+import copy
+import json
+
+from pyramid.request import Request
+
+from cornice_apispec import generate_spec
+from cornice_apispec.components import dedupe_components
+
+from .conftest import plugins, swagger_info
+
+
+def make_spec(app, info=swagger_info):
+    request = Request.blank('/')
+    request.registry = app.app.registry
+    return generate_spec(request, info, plugins, use_cache=False)
+
+
+def resolve(spec, value):
+    if '$ref' not in value:
+        return value
+    _, _, section, name = value['$ref'].split('/')
+    return spec['components'][section][name]
+
+
+def test_repeated_objects_are_components(app):
+    spec = make_spec(app)
+
+    assert sorted(spec['components']['parameters']) == ['X-Request-Id-header', 'id-path']
+    assert sorted(spec['components']['responses']) == ['Not_Found', 'UserSchema']
+    assert spec['components']['parameters']['id-path'] == {
+        'name': 'id', 'in': 'path', 'required': True, 'schema': {'type': 'string'}, 'description': 'id parameter'}
+    user = spec['paths']['/users/{id}']
+    assert {'$ref': '#/components/parameters/id-path'} in user['get']['parameters']
+    assert user['get']['responses']['404'] == {'$ref': '#/components/responses/Not_Found'}
+    # used once: kept inline
+    assert spec['paths']['/items/{id}']['get']['responses']['200'] == {'description': 'The item', 'content': {}}
+
+
+def test_same_document_once_resolved(app):
+    inline = make_spec(app, dict(swagger_info, dedupe_components=False))
+    spec = make_spec(app)
+
+    assert 'parameters' not in inline['components']
+    for path, path_item in spec['paths'].items():
+        for method, operation in path_item.items():
+            expected = inline['paths'][path][method]
+            assert [resolve(spec, parameter) for parameter in operation['parameters']] == expected['parameters']
+            assert dict((status, resolve(spec, response)) for status, response in operation['responses'].items()) \
+                == expected['responses']
+    assert len(json.dumps(spec)) < len(json.dumps(inline))
+
+
+def test_spec_not_modified():
+    parameter = {'name': 'id', 'in': 'path', 'required': True}
+    spec = {'paths': {'/a/{id}': {'get': {'parameters': [parameter]}},
+                      '/b/{id}': {'get': {'parameters': [parameter]}}}}
+    original = copy.deepcopy(spec)
+
+    deduped = dedupe_components(spec)
+
+    assert spec == original
+    assert deduped['components'] == {'parameters': {'id-path': parameter}}
+
+
+def test_name_collisions():
+    first = {'name': 'id', 'in': 'path', 'required': True}
+    second = {'name': 'id', 'in': 'path', 'required': True, 'description': 'Other'}
+    spec = {'paths': {'/a/{id}': {'get': {'parameters': [first]}, 'put': {'parameters': [second]}},
+                      '/b/{id}': {'get': {'parameters': [first]}, 'put': {'parameters': [second]}}},
+            'components': {'parameters': {'existing': {'name': 'q', 'in': 'query'}}}}
+
+    parameters = dedupe_components(spec)['components']['parameters']
+
+    assert list(parameters)[:2] == ['existing', 'id-path']
+    assert list(parameters)[2].startswith('id-path-')
+    assert list(parameters.values())[1:] == [first, second]
+
+
+def test_nothing_repeated():
+    spec = {'paths': {'/a': {'get': {'responses': {'200': {'description': 'OK'}}}}}}
+
+    assert dedupe_components(spec) is spec
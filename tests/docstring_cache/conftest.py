@@ -0,0 +1,45 @@
+import pytest
+from pyramid.config import Configurator
+from webtest import TestApp
+from cornice import Service
+
+from cornice_apispec import clear_docstring_cache
+
+user_info = Service(name='users',
+                    path='/users',
+                    apispec_show=True,
+                    description='Get and set user data.')
+
+
+@user_info.get()
+@user_info.put()
+def set_info(request):
+    """Get or replace an user.
+
+    ---
+    description: Get or replace an user
+    responses:
+        200:
+            description: The user
+    """
+    return {'name': 'Name'}
+
+
+def main(global_config, **settings):
+
+    config = Configurator(settings=settings)
+
+    config.include('cornice')
+    config.include('cornice_apispec')
+
+    config.scan(exclude=['tests'])
+
+    return config.make_wsgi_app()
+
+
+@pytest.fixture
+def app():
+    clear_docstring_cache()
+    app = main({})
+
+    return TestApp(app)
@@ -0,0 +1,53 @@
+from apispec import yaml_utils
+from apispec.ext.marshmallow import MarshmallowPlugin
+from pyramid.request import Request
+
+from cornice_apispec import clear_docstring_cache, docstrings, generate_spec
+
+from .conftest import set_info
+
+
+def make_request(app):
+    request = Request.blank('/')
+    request.registry = app.app.registry
+    return request
+
+
+def count_parses(monkeypatch):
+    calls = []
+    load_yaml = yaml_utils.load_yaml_from_docstring
+
+    def counting_load_yaml(docstring):
+        calls.append(docstring)
+        return load_yaml(docstring)
+
+    monkeypatch.setattr(yaml_utils, 'load_yaml_from_docstring', counting_load_yaml)
+    return calls
+
+
+def test_docstring_parsed_once(app, monkeypatch):
+    calls = count_parses(monkeypatch)
+
+    for _ in range(3):
+        spec = generate_spec(make_request(app), {'title': "My API"}, plugins=[MarshmallowPlugin], use_cache=False)
+
+    assert calls == [set_info.__doc__]
+    assert spec['paths']['/users']['get']['description'] == 'Get or replace an user'
+    assert spec['paths']['/users']['put']['description'] == 'Get or replace an user'
+
+
+def test_clear_docstring_cache(app, monkeypatch):
+    calls = count_parses(monkeypatch)
+
+    generate_spec(make_request(app), {'title': "My API"}, plugins=[MarshmallowPlugin], use_cache=False)
+    clear_docstring_cache()
+    generate_spec(make_request(app), {'title': "My API"}, plugins=[MarshmallowPlugin], use_cache=False)
+
+    assert len(calls) == 2
+
+
+def test_cached_operations_are_copies(app):
+    operation = docstrings.load_docstring_yaml(set_info.__doc__)
+    operation['description'] = 'Changed'
+
+    assert docstrings.load_docstring_yaml(set_info.__doc__)['description'] == 'Get or replace an user'
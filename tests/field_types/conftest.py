@@ -0,0 +1,53 @@
+import marshmallow
+import pytest
+from pyramid.config import Configurator
+from webtest import TestApp
+from cornice import Service
+
+from cornice_apispec.validators import apispec_marshmallow_querystring_validator
+
+
+class PositiveInteger(marshmallow.fields.Integer):
+    pass
+
+
+class ItemSchema(marshmallow.Schema):
+    label = marshmallow.fields.String()
+
+
+class QuerySchema(marshmallow.Schema):
+    page = PositiveInteger(missing=1)
+    order = marshmallow.fields.String(validate=marshmallow.validate.OneOf(['asc', 'desc']))
+    ids = marshmallow.fields.List(marshmallow.fields.UUID())
+    items = marshmallow.fields.Nested(ItemSchema, many=True)
+    filters = marshmallow.fields.Dict()
+    since = marshmallow.fields.DateTime()
+
+
+items = Service(name='items',
+                path='/items',
+                apispec_show=True)
+
+
+@items.get(schema=QuerySchema, validators=(apispec_marshmallow_querystring_validator,))
+def get_items(request):
+    return []
+
+
+def main(global_config, **settings):
+
+    config = Configurator(settings=settings)
+
+    config.include('cornice')
+    config.include('cornice_apispec')
+
+    config.scan(exclude=['tests'])
+
+    return config.make_wsgi_app()
+
+
+@pytest.fixture
+def app():
+    app = main({})
+
+    return TestApp(app)
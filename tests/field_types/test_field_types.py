@@ -0,0 +1,89 @@
+import datetime
+import enum
+
+import marshmallow
+from apispec.ext.marshmallow import MarshmallowPlugin
+from pyramid.request import Request
+
+from cornice_apispec import generate_spec, register_field_type
+from cornice_apispec.fields import field_to_openapi
+
+
+class Money(marshmallow.fields.Field):
+    pass
+
+
+class Price(Money):
+    pass
+
+
+def test_querystring_parameters(app):
+    request = Request.blank('/')
+    request.registry = app.app.registry
+
+    spec = generate_spec(request, {'title': "My API"}, plugins=[MarshmallowPlugin])
+
+    parameters = dict(
+        (parameter['name'], parameter['schema'])
+        for parameter in spec['paths']['/items']['get']['parameters']
+    )
+    assert parameters == {
+        'page': {'type': 'integer', 'default': 1},
+        'order': {'type': 'string', 'enum': ['asc', 'desc']},
+        'ids': {'type': 'array', 'items': {'type': 'string', 'format': 'uuid'}},
+        'items': {'type': 'array', 'items': {'type': 'object'}},
+        'filters': {'type': 'object'},
+        'since': {'type': 'string', 'format': 'date-time'},
+    }
+
+
+def test_register_field_type():
+    assert field_to_openapi(Price()) == {'type': 'string'}
+
+    register_field_type(Money, 'string', 'decimal')
+
+    assert field_to_openapi(Price()) == {'type': 'string', 'format': 'decimal'}
+    assert field_to_openapi(Money) == {'type': 'string', 'format': 'decimal'}
+
+
+def test_result_is_a_copy():
+    field_to_openapi(marshmallow.fields.Integer())['format'] = 'int64'
+
+    assert field_to_openapi(marshmallow.fields.Integer()) == {'type': 'integer'}
+
+
+def test_load_default_is_read_before_missing():
+    class LoadDefaultField(marshmallow.fields.Integer):
+        load_default = 10
+
+        def get_missing(self):
+            raise AssertionError('deprecated since marshmallow 3.13')
+
+        def set_missing(self, value):
+            pass
+
+        missing = property(get_missing, set_missing)
+
+    assert field_to_openapi(LoadDefaultField()) == {'type': 'integer', 'default': 10}
+
+
+def test_enum_needs_json_choices():
+    field = marshmallow.fields.Date(validate=marshmallow.validate.OneOf([datetime.date(2020, 1, 1)]))
+
+    assert field_to_openapi(field) == {'type': 'string', 'format': 'date'}
+    assert field_to_openapi(marshmallow.fields.String(validate=marshmallow.validate.OneOf(['a', 'b']))) == {
+        'type': 'string', 'enum': ['a', 'b']}
+
+
+def test_enum_field_values():
+    class Color(enum.Enum):
+        red = 1
+
+    class EnumField(marshmallow.fields.Field):
+        def __init__(self, enum, by_value=False, **kwargs):
+            super(EnumField, self).__init__(**kwargs)
+            self.enum = enum
+            self.by_value = by_value
+
+    assert field_to_openapi(EnumField(Color))['enum'] == ['red']
+    assert field_to_openapi(EnumField(Color, by_value=True))['enum'] == [1]
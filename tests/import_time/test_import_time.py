@@ -0,0 +1,36 @@
+import json
+import subprocess
+import sys
+
+# Seconds `import cornice_apispec` may take once Pyramid and Cornice are imported
+IMPORT_BUDGET = 0.5
+
+# Imported when the first spec is built, not at boot
+LAZY_MODULES = ('apispec', 'yaml', 'pyramid_apispec', 'colander')
+
+SCRIPT = '''
+import json, sys, time
+import cornice, cornice.validators, pyramid.config
+modules = set(sys.modules)
+start = time.time()
+import cornice_apispec, cornice_apispec.validators, cornice_apispec.views
+print(json.dumps({'seconds': time.time() - start,
+                  'modules': sorted(set(name.split('.')[0] for name in set(sys.modules) - modules))}))
+'''
+
+
+def import_cornice_apispec():
+    return json.loads(subprocess.check_output([sys.executable, '-c', SCRIPT]).decode('utf-8'))
+
+
+def test_import_is_lazy():
+    modules = import_cornice_apispec()['modules']
+
+    assert [module for module in LAZY_MODULES if module in modules] == []
+
+
+def test_import_time_budget():
+    # the best of a few runs, against noisy neighbours
+    seconds = min(import_cornice_apispec()['seconds'] for _ in range(3))
+
+    assert seconds < IMPORT_BUDGET
@@ -0,0 +1,72 @@
+import marshmallow
+import pytest
+from apispec.ext.marshmallow import MarshmallowPlugin
+from pyramid.config import Configurator
+from pyramid.view import view_config
+from webtest import TestApp
+from cornice import Service
+
+from cornice_apispec import generate_spec
+
+
+class Schema(marshmallow.Schema):
+    name = marshmallow.fields.String(required=True)
+
+
+user_info = Service(name='users',
+                    path='/users/{id}',
+                    apispec_show=True,
+                    apispec_response_schemas={200: Schema},
+                    description='Get and set user data.')
+
+
+@user_info.get()
+def get_info(request):
+    return {'name': 'Name'}
+
+
+@user_info.post(schema=Schema, content_type='application/json')
+def post_info(request):
+    return {'name': 'Name'}
+
+
+@user_info.put(schema=Schema, content_type='application/json')
+def put_info(request):
+    return {'name': 'Name'}
+
+
+@user_info.delete()
+def delete_info(request):
+    return {}
+
+
+@view_config(route_name='openapi_spec', renderer='json')
+def api_spec(request):
+    swagger_info = {
+        'title': "My API",
+        'version': "1.0.0",
+        'show_head': False
+    }
+    openapi_spec = generate_spec(request, swagger_info, plugins=[MarshmallowPlugin])
+    return openapi_spec
+
+
+def main(global_config, **settings):
+
+    config = Configurator(settings=settings)
+
+    config.include('cornice')
+    config.include('cornice_apispec')
+
+    config.add_route('openapi_spec', '/api-info')
+
+    config.scan(exclude=['tests'])
+
+    return config.make_wsgi_app()
+
+
+@pytest.fixture
+def app():
+    app = main({})
+
+    return TestApp(app)
@@ -0,0 +1,27 @@
+from cornice_apispec import paths
+
+
+def test_swagger(app):
+
+    response = app.get('/api-info')
+
+    operations = response.json['paths']['/users/{id}']
+    assert list(operations) == ['get', 'post', 'put', 'delete']
+    assert operations['post']['requestBody'] == {
+        'content': {'application/json': {'schema': {'$ref': '#/components/schemas/Schema'}}}}
+    assert list(response.json['components']['schemas']) == ['Schema']
+
+
+def test_each_view_is_converted_once(app, monkeypatch):
+    calls = []
+    collect_operations = paths.collect_operations
+
+    def counting_collect_operations(uri_pattern, view, *args, **kwargs):
+        calls.append(view.discriminator_hash)
+        return collect_operations(uri_pattern, view, *args, **kwargs)
+
+    monkeypatch.setattr(paths, 'collect_operations', counting_collect_operations)
+
+    app.get('/api-info')
+
+    assert len(calls) == len(set(calls))
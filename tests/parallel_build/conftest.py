@@ -0,0 +1,47 @@
+import marshmallow
+import pytest
+from pyramid.config import Configurator
+from cornice import Service
+from cornice.validators import marshmallow_body_validator
+
+
+class Schema(marshmallow.Schema):
+    name = marshmallow.fields.String(required=True)
+
+
+def make_view(name):
+    def view(request):
+        return {}
+    view.__name__ = name
+    return view
+
+
+def make_config(settings):
+    config = Configurator(settings=settings)
+
+    config.include('cornice')
+    config.include('cornice_apispec')
+
+    for index in range(20):
+        service = Service(name='service_{}'.format(index),
+                          path='/resources_{}/{{id}}'.format(index),
+                          apispec_show=True,
+                          apispec_tags=['tag_{}'.format(index % 3)],
+                          apispec_response_schemas={200: Schema, 404: 'Not Found'})
+        service.add_view('GET', make_view('get_{}'.format(index)))
+        service.add_view('POST', make_view('post_{}'.format(index)), schema=Schema,
+                         validators=(marshmallow_body_validator,), content_type='application/json')
+        config.add_cornice_service(service)
+
+    config.commit()
+    return config
+
+
+@pytest.fixture
+def registry():
+    return make_config({}).registry
+
+
+@pytest.fixture
+def parallel_registry():
+    return make_config({'cornice_apispec.workers': '4'}).registry
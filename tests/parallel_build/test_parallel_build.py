@@ -0,0 +1,75 @@
+import json
+import os
+
+import marshmallow
+import pytest
+from apispec.ext.marshmallow import MarshmallowPlugin
+from cornice import Service
+
+from cornice_apispec import paths, workers
+from cornice_apispec.profiling import SpecProfiler
+from cornice_apispec.spec import build_spec
+
+from .conftest import make_config
+
+swagger_info = {'title': "My API", 'version': "1.0.0"}
+plugins = [MarshmallowPlugin]
+
+pytestmark = pytest.mark.skipif(not hasattr(os, 'fork'), reason='workers are forked')
+
+
+def record_conversions(monkeypatch):
+    # forked workers record in their own copy of the list
+    converted = []
+    get_route_operations = paths.get_route_operations
+
+    def recording_get_route_operations(registry, route, **kwargs):
+        converted.append(route['name'])
+        return get_route_operations(registry, route, **kwargs)
+
+    monkeypatch.setattr(paths, 'get_route_operations', recording_get_route_operations)
+    return converted
+
+
+def test_parallel_build_is_deterministic(registry, parallel_registry, monkeypatch):
+    serial = build_spec(registry, swagger_info, plugins)
+    converted = record_conversions(monkeypatch)
+    parallel = build_spec(parallel_registry, swagger_info, plugins)
+
+    assert converted == []
+    assert json.dumps(parallel) == json.dumps(serial)
+    assert not workers.in_worker()
+
+
+def test_workers_argument(registry, monkeypatch):
+    converted = record_conversions(monkeypatch)
+
+    build_spec(registry, swagger_info, plugins, workers=2)
+
+    assert converted == []
+
+
+def test_unshared_schemas_are_converted_serially(monkeypatch):
+    class Created(marshmallow.Schema):
+        title = marshmallow.fields.String()
+
+    service = Service(name='created', path='/created', apispec_show=True,
+                      apispec_response_schemas={200: lambda: Created(many=True)})
+    service.add_view('GET', lambda request: {})
+    config = make_config({'cornice_apispec.workers': '4'})
+    config.add_cornice_service(service)
+    config.commit()
+    converted = record_conversions(monkeypatch)
+
+    spec = build_spec(config.registry, swagger_info, plugins)
+
+    assert converted == ['created']
+    assert [name for name in spec['components']['schemas'] if name.startswith('Created')]
+
+
+def test_parallel_profile(parallel_registry):
+    profiler = SpecProfiler()
+
+    build_spec(parallel_registry, swagger_info, plugins, profiler=profiler)
+
+    assert profiler.report()['phases']['workers']['calls'] == 1
@@ -0,0 +1,51 @@
+import pytest
+from apispec.ext.marshmallow import MarshmallowPlugin
+from pyramid.config import Configurator
+from pyramid.view import view_config
+from webtest import TestApp
+
+from cornice_apispec import generate_spec
+
+
+@view_config(route_name='health',
+             request_method='GET',
+             renderer='json',
+             apispec_show=True,
+             apispec_tags=['health'],
+             apispec_summary='Returns healthcheck',
+             apispec_description='Long description for operation')
+def health_check(request):
+    return {'status': 'OK'}
+
+
+@view_config(route_name='openapi_spec', renderer='json')
+def api_spec(request):
+    swagger_info = {
+        'title': "My API",
+        'version': "1.0.0",
+        'tag_list': [{'name': 'health', 'description': 'Health check'}],
+    }
+    openapi_spec = generate_spec(request, swagger_info, plugins=[MarshmallowPlugin])
+    return openapi_spec
+
+
+def main(global_config, **settings):
+
+    config = Configurator(settings=settings)
+
+    config.include('cornice')
+    config.include('cornice_apispec')
+
+    config.add_route('health', '/health')
+    config.add_route('openapi_spec', '/api-info')
+
+    config.scan(exclude=['tests'])
+
+    return config.make_wsgi_app()
+
+
+@pytest.fixture
+def app():
+    app = main({})
+
+    return TestApp(app)
@@ -0,0 +1,50 @@
+import pytest
+from pyramid.config import Configurator
+from pyramid.exceptions import ConfigurationConflictError
+
+from cornice_apispec.derivers import APISPEC_VIEW_OPTIONS
+
+
+def test_api(app):
+
+    response = app.get('/health', status=200)
+    assert response.json == {'status': 'OK'}
+
+
+def test_swagger(app):
+
+    response = app.get('/api-info')
+
+    assert response.json['paths'] == {
+        '/health': {
+            'get': {
+                'tags': ['health'],
+                'summary': 'Returns healthcheck',
+                'description': 'Long description for operation'
+            }
+        }
+    }
+
+
+def test_apispec_options_are_not_predicates(app):
+    introspector = app.app.registry.introspector
+    health_views = [
+        view['introspectable'] for view in introspector.get_category('views')
+        if view['introspectable']['route_name'] == 'health'
+    ]
+
+    assert len(health_views) == 1
+    assert health_views[0]['apispec_tags'] == ['health']
+    assert [predicate.text() for predicate in health_views[0]['predicates']] == ['request_method = GET,HEAD']
+    assert not [option for option in APISPEC_VIEW_OPTIONS if option in health_views[0]['phash']]
+
+
+def test_views_differing_by_apispec_options_conflict():
+    config = Configurator()
+    config.include('cornice_apispec')
+    config.add_route('health', '/health')
+    config.add_view(lambda request: {}, route_name='health', request_method='GET', apispec_summary='One')
+    config.add_view(lambda request: {}, route_name='health', request_method='GET', apispec_summary='Other')
+
+    with pytest.raises(ConfigurationConflictError):
+        config.commit()
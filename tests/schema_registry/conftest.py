@@ -0,0 +1,21 @@
+import marshmallow
+import pytest
+from apispec import APISpec
+from apispec.ext.marshmallow import MarshmallowPlugin
+
+
+class UserSchema(marshmallow.Schema):
+    name = marshmallow.fields.String()
+    email = marshmallow.fields.Email()
+
+
+def make_other_user_schema():
+    # Same name, another class: e.g. from two modules of a large app
+    class UserSchema(marshmallow.Schema):
+        login = marshmallow.fields.String()
+    return UserSchema
+
+
+@pytest.fixture
+def spec():
+    return APISpec(title='My API', version='1.0.0', plugins=[MarshmallowPlugin()], openapi_version='3.0.2')
@@ -0,0 +1,74 @@
+import logging
+
+from cornice_apispec import utils
+from cornice_apispec.utils import add_schema_in_spec, get_schema_name
+
+from .conftest import UserSchema, make_other_user_schema
+
+
+def test_instance_name_is_computed_once(monkeypatch):
+    schema = UserSchema(exclude=('email',))
+    name = get_schema_name(schema)
+
+    monkeypatch.setattr(utils, '_get_instance_name', lambda schema: 'Other')
+
+    assert name.startswith('UserSchema-')
+    assert get_schema_name(schema) == name
+    assert get_schema_name(UserSchema(exclude=('email',))) == 'Other'
+
+
+def test_same_schema_is_added_once(spec, monkeypatch):
+    calls = []
+    add_component = spec.components.schema
+    monkeypatch.setattr(spec.components, 'schema', lambda *args, **kwargs: calls.append(args) or add_component(
+        *args, **kwargs))
+
+    add_schema_in_spec(spec, UserSchema)
+    add_schema_in_spec(spec, UserSchema(exclude=('email',)))
+    add_schema_in_spec(spec, UserSchema)
+    add_schema_in_spec(spec, UserSchema(exclude=('email',)))
+    add_schema_in_spec(spec, 'Not Found')
+
+    name = get_schema_name(UserSchema(exclude=('email',)))
+    assert calls == [('UserSchema',), (name,)]
+    assert sorted(spec.to_dict()['components']['schemas']) == ['UserSchema', name]
+
+
+def test_name_collision_is_logged(spec, caplog):
+    add_schema_in_spec(spec, UserSchema)
+
+    with caplog.at_level(logging.WARNING, logger='cornice_apispec.utils'):
+        add_schema_in_spec(spec, make_other_user_schema())
+
+    assert 'UserSchema' in caplog.text
+    assert sorted(spec.to_dict()['components']['schemas']['UserSchema']['properties']) == ['email', 'name']
+
+
+def test_registries_are_per_spec(spec):
+    from apispec import APISpec
+
+    other_spec = APISpec(title='My API', version='1.0.0', plugins=[], openapi_version='3.0.2')
+    add_schema_in_spec(spec, UserSchema)
+    add_schema_in_spec(other_spec, UserSchema)
+
+    assert list(other_spec.to_dict()['components']['schemas']) == ['UserSchema']
+
+
+def test_only_and_partial_get_their_own_names(spec):
+    full, only, partial = UserSchema(), UserSchema(only=('name',)), UserSchema(partial=True)
+
+    assert len({get_schema_name(full), get_schema_name(only), get_schema_name(partial)}) == 3
+    assert get_schema_name(UserSchema(only=('name',))) == get_schema_name(only)
+
+    for schema in (full, only, partial):
+        add_schema_in_spec(spec, schema)
+    assert sorted(spec.to_dict()['components']['schemas'][get_schema_name(only)]['properties']) == ['name']
+
+
+def test_option_collision_is_logged(spec, caplog):
+    add_schema_in_spec(spec, UserSchema())
+
+    with caplog.at_level(logging.WARNING, logger='cornice_apispec.utils'):
+        add_schema_in_spec(spec, UserSchema(many=True))
+
+    assert get_schema_name(UserSchema()) in caplog.text
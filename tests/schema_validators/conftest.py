@@ -0,0 +1,95 @@
+import marshmallow
+import pytest
+from pyramid.config import Configurator
+from webtest import TestApp
+from cornice import Service
+
+from cornice_apispec.validators import (
+    apispec_marshmallow_body_validator, apispec_marshmallow_headers_validator,
+    apispec_marshmallow_querystring_validator, apispec_marshmallow_validator, marshmallow_validator_for
+)
+
+swagger_info = {
+    'title': "My API",
+    'version': "1.0.0",
+    'show_head': False
+}
+
+
+class UserSchema(marshmallow.Schema):
+    """User."""
+
+    instances = 0
+
+    name = marshmallow.fields.String(required=True)
+    age = marshmallow.fields.Integer()
+
+    def __init__(self, *args, **kwargs):
+        super(UserSchema, self).__init__(*args, **kwargs)
+        UserSchema.instances += 1
+
+    @marshmallow.validates('name')
+    def validate_name(self, value):
+        if value == self.context['request'].headers.get('X-Reserved-Name'):
+            raise marshmallow.ValidationError('Reserved name.')
+
+
+class PageSchema(marshmallow.Schema):
+    page = marshmallow.fields.Integer(missing=1)
+
+
+class HeadersSchema(marshmallow.Schema):
+    token = marshmallow.fields.String(required=True, load_from='X-Token')
+
+
+class RequestSchema(marshmallow.Schema):
+    body = marshmallow.fields.Nested(UserSchema)
+    querystring = marshmallow.fields.Nested(PageSchema)
+
+
+users = Service(name='users', path='/users', apispec_show=True)
+
+
+@users.post(schema=UserSchema, validators=(apispec_marshmallow_body_validator,))
+def create_user(request):
+    return request.validated
+
+
+@users.patch(schema=UserSchema, validators=(marshmallow_validator_for('body', partial=True),))
+def update_user(request):
+    return request.validated
+
+
+@users.get(schema=PageSchema, validators=(apispec_marshmallow_querystring_validator,))
+def list_users(request):
+    return request.validated
+
+
+@users.put(schema=RequestSchema, validators=(apispec_marshmallow_validator,))
+def replace_users(request):
+    return request.validated
+
+
+session = Service(name='session', path='/session', apispec_show=True)
+
+
+@session.get(schema=HeadersSchema, validators=(apispec_marshmallow_headers_validator,))
+def get_session(request):
+    return request.validated
+
+
+def main(global_config, **settings):
+
+    config = Configurator(settings=settings)
+
+    config.include('cornice')
+    config.include('cornice_apispec')
+
+    config.scan(exclude=['tests'])
+
+    return config.make_wsgi_app()
+
+
+@pytest.fixture
+def app():
+    return TestApp(main({}))
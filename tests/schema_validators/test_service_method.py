@@ -0,0 +1,56 @@
+from apispec.ext.marshmallow import MarshmallowPlugin
+from cornice import Service
+from pyramid.request import Request
+
+from cornice_apispec import generate_spec
+from cornice_apispec.autodoc import AutoDoc, get_service_method
+from cornice_apispec.constants import DEFAULT_CONTENT_TYPE
+from cornice_apispec.validators import apispec_marshmallow_body_validator
+
+from .conftest import PageSchema, RequestSchema, UserSchema, swagger_info, users
+
+
+def test_resolved_once():
+    service_method = get_service_method(users, 'post')
+
+    assert get_service_method(users, 'POST') is service_method
+    assert service_method.request_schema is UserSchema
+    assert service_method.validators == [apispec_marshmallow_body_validator]
+    assert service_method.content_type == DEFAULT_CONTENT_TYPE
+    assert service_method.schema_locations == {'body': UserSchema, 'headers': None, 'querystring': None}
+
+
+def test_schema_locations():
+    assert get_service_method(users, 'get').schema_locations == {
+        'body': None, 'headers': None, 'querystring': PageSchema}
+    assert get_service_method(users, 'put').schema_locations == {
+        'body': UserSchema, 'headers': None, 'querystring': PageSchema}
+    assert get_service_method(users, 'put').request_schema is RequestSchema
+
+
+def test_resolved_again_after_new_definitions():
+    service = Service(name='documents', path='/documents')
+    service.add_view('GET', lambda request: {})
+    assert get_service_method(service, 'post').request_schema is None
+
+    service.add_view('POST', lambda request: {}, schema=UserSchema, content_type='application/json')
+
+    assert get_service_method(service, 'post').request_schema is UserSchema
+    assert get_service_method(service, 'post').content_type == 'application/json'
+
+
+def test_autodoc_reads_the_service_method(app, monkeypatch):
+    request = Request.blank('/')
+    request.registry = app.app.registry
+    expected = generate_spec(request, swagger_info, plugins=[MarshmallowPlugin], use_cache=False)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('service definitions scanned again')
+
+    monkeypatch.setattr(Service, 'filter_argumentlist', fail)
+    monkeypatch.setattr(Service, 'get_validators', fail)
+
+    assert generate_spec(request, swagger_info, plugins=[MarshmallowPlugin], use_cache=False) == expected
+    auto_doc = AutoDoc('POST', {}, users)
+    assert auto_doc.find_schema_for('body') is UserSchema
+    assert auto_doc.service_method is get_service_method(users, 'POST')
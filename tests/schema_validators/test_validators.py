@@ -0,0 +1,111 @@
+import threading
+
+from apispec.ext.marshmallow import MarshmallowPlugin
+from pyramid.request import Request
+
+from cornice_apispec import generate_spec
+from cornice_apispec.validators import apispec_marshmallow_body_validator, get_schemas, get_validator_location
+
+from .conftest import UserSchema, swagger_info
+
+
+def test_body(app):
+    response = app.post_json('/users', {'name': 'Ann', 'age': 30, 'other': 1})
+
+    assert response.json == {'name': 'Ann', 'age': 30}
+
+
+def test_body_errors(app):
+    response = app.post_json('/users', {'age': 'old'}, status=400)
+
+    errors = sorted((error['location'], error['name']) for error in response.json['errors'])
+    assert errors == [('body', 'age'), ('body', 'name')]
+
+
+def test_schema_context_has_the_request(app):
+    response = app.post_json('/users', {'name': 'root'}, headers={'X-Reserved-Name': 'root'}, status=400)
+
+    assert response.json['errors'][0]['description'] == ['Reserved name.']
+    app.post_json('/users', {'name': 'root'}, headers={'X-Reserved-Name': 'admin'}, status=200)
+
+
+def test_schema_options(app):
+    assert app.patch_json('/users', {'age': 31}).json == {'age': 31}
+
+
+def test_querystring(app):
+    assert app.get('/users', {'page': '2'}).json == {'page': 2}
+    assert app.get('/users').json == {'page': 1}
+
+
+def test_headers(app):
+    assert app.get('/session', headers={'X-Token': 'abc'}).json == {'token': 'abc'}
+    app.get('/session', status=400)
+
+
+def test_all_locations(app):
+    response = app.put_json('/users?page=3', {'name': 'Ann'})
+
+    assert response.json['body'] == {'name': 'Ann'}
+    assert response.json['querystring'] == {'page': 3}
+
+
+def test_schema_built_once(app):
+    app.post_json('/users', {'name': 'Ann'})
+    instances = UserSchema.instances
+
+    for _ in range(3):
+        app.post_json('/users', {'name': 'Ann'})
+
+    assert UserSchema.instances == instances
+
+
+def test_schemas_per_thread():
+    schemas = []
+    thread = threading.Thread(target=lambda: schemas.append(get_schemas(UserSchema, 'body')))
+    thread.start()
+    thread.join()
+
+    assert get_schemas(UserSchema, 'body') is get_schemas(UserSchema, 'body')
+    assert get_schemas(UserSchema, 'body') is not schemas[0]
+    assert get_schemas(UserSchema, 'body', partial=True) is not get_schemas(UserSchema, 'body')
+
+
+def test_context_released(app):
+    app.post_json('/users', {'name': 'Ann'})
+
+    instance, request_schema = get_schemas(UserSchema, 'body')
+    assert 'request' not in instance.context
+    assert 'request' not in request_schema.context
+
+
+def test_documented(app):
+    request = Request.blank('/')
+    request.registry = app.app.registry
+
+    spec = generate_spec(request, swagger_info, plugins=[MarshmallowPlugin], use_cache=False)
+
+    users = spec['paths']['/users']
+    assert users['post']['requestBody']['content']['text/plain']['schema'] == {
+        '$ref': '#/components/schemas/UserSchema'}
+    assert [parameter['name'] for parameter in users['get']['parameters']] == ['page']
+    assert get_validator_location(apispec_marshmallow_body_validator) == 'body'
+
+
+def test_schema_instance_is_copied():
+    schema = UserSchema(only=('age',))
+
+    instance, request_schema = get_schemas(schema, 'body')
+
+    assert instance is not schema
+    assert instance.only == schema.only
+    assert request_schema.load({'body': {'name': 'Ann', 'age': 3}}).data == {'body': {'age': 3}}
+
+
+def test_cornice_validators_not_modified():
+    from cornice import validators
+
+    for name in ('marshmallow_validator', 'marshmallow_body_validator', 'colander_body_validator'):
+        assert 'location' not in getattr(validators, name).__dict__
+    assert get_validator_location(validators.marshmallow_body_validator) == 'body'
+    assert get_validator_location(validators.colander_validator) == 'all'
@@ -0,0 +1,66 @@
+import marshmallow
+import pytest
+from apispec.ext.marshmallow import MarshmallowPlugin
+from pyramid.config import Configurator
+from webtest import TestApp
+from cornice import Service
+
+swagger_info = {
+    'title': "My API",
+    'version': "1.0.0",
+    'show_head': False
+}
+
+
+class Schema(marshmallow.Schema):
+    name = marshmallow.fields.String(required=True)
+
+
+user_info = Service(name='users',
+                    path='/users',
+                    apispec_show=True,
+                    apispec_response_schemas={200: Schema},
+                    description='Get and set user data.')
+
+
+@user_info.get()
+def get_info(request):
+    return {'name': 'Name'}
+
+
+def main(global_config, **settings):
+
+    config = Configurator(settings=settings)
+
+    config.include('cornice')
+    config.include('cornice_apispec')
+
+    config.cornice_apispec_add_spec_view(swagger_info=swagger_info, plugins=[MarshmallowPlugin])
+
+    config.scan(exclude=['tests'])
+
+    return config.make_wsgi_app()
+
+
+def main_without_spec_view(global_config, **settings):
+
+    config = Configurator(settings=settings)
+
+    config.include('cornice')
+    config.include('cornice_apispec')
+
+    config.scan(exclude=['tests'])
+
+    return config.make_wsgi_app()
+
+
+@pytest.fixture
+def spec_path(tmpdir):
+    return str(tmpdir.join('openapi.json'))
+
+
+@pytest.fixture
+def prebuilt_app(spec_path):
+    app = main({}, **{'cornice_apispec.prebuilt_path': spec_path})
+
+    return TestApp(app)
@@ -0,0 +1,87 @@
+import json
+import os
+
+import yaml
+
+from cornice_apispec.scripts.build import main
+
+APP = 'tests.spec_build.conftest:main'
+
+
+def test_build_writes_json(spec_path):
+    assert main([APP, '--out', spec_path]) == 0
+
+    with open(spec_path) as spec_file:
+        spec = json.load(spec_file)
+
+    assert spec['info'] == {'title': 'My API', 'version': '1.0.0'}
+    assert list(spec['paths']) == ['/users']
+    assert 'Schema' in spec['components']['schemas']
+    assert 'servers' not in spec
+
+
+def test_build_replaces_file_atomically(spec_path):
+    with open(spec_path, 'w') as spec_file:
+        spec_file.write('{}')
+
+    assert main([APP, '--out', spec_path]) == 0
+
+    assert os.listdir(os.path.dirname(spec_path)) == ['openapi.json']
+    with open(spec_path) as spec_file:
+        assert list(json.load(spec_file)['paths']) == ['/users']
+
+
+def test_build_writes_compact_json(spec_path):
+    assert main([APP, '--out', spec_path, '--compact']) == 0
+
+    with open(spec_path) as spec_file:
+        content = spec_file.read()
+
+    assert content == json.dumps(json.loads(content), separators=(',', ':'))
+
+
+def test_build_writes_yaml_with_server_url(tmpdir):
+    spec_path = str(tmpdir.join('openapi.yaml'))
+
+    assert main([APP, '--out', spec_path, '--server-url', 'https://api.example.com']) == 0
+
+    with open(spec_path) as spec_file:
+        spec = yaml.safe_load(spec_file)
+
+    assert spec['servers'] == [{'url': 'https://api.example.com'}]
+    assert list(spec['paths']) == ['/users']
+
+
+def test_build_from_config_file(tmpdir, spec_path):
+    ini_path = tmpdir.join('app.ini')
+    ini_path.write('[app:main]\nuse = call:tests.spec_build.conftest:main\n')
+
+    assert main([str(ini_path), '--out', spec_path]) == 0
+
+    with open(spec_path) as spec_file:
+        assert list(json.load(spec_file)['paths']) == ['/users']
+
+
+def test_build_without_spec_view(spec_path):
+    app = 'tests.spec_build.conftest:main_without_spec_view'
+
+    assert main([app, '--out', spec_path]) == 2
+    assert main([app, '--out', spec_path, '--swagger-info', 'tests.spec_build.conftest:swagger_info']) == 0
+
+    with open(spec_path) as spec_file:
+        assert json.load(spec_file)['info']['title'] == 'My API'
+
+
+def test_serve_prebuilt_spec(spec_path, prebuilt_app):
+    assert main([APP, '--out', spec_path]) == 0
+    with open(spec_path) as spec_file:
+        spec = json.load(spec_file)
+    spec['info']['title'] = 'Prebuilt API'
+    with open(spec_path, 'w') as spec_file:
+        json.dump(spec, spec_file)
+
+    response = prebuilt_app.get('/openapi.json')
+
+    assert response.json['info']['title'] == 'Prebuilt API'
+    assert response.json['servers'] == [{'url': 'http://localhost:80'}]
+    assert response.json['paths'] == spec['paths']
@@ -0,0 +1,71 @@
+import marshmallow
+import pytest
+from apispec.ext.marshmallow import MarshmallowPlugin
+from pyramid.config import Configurator
+from pyramid.request import Request
+from pyramid.view import view_config
+from webtest import TestApp
+from cornice import Service
+from cornice.validators import marshmallow_body_validator
+
+from cornice_apispec import generate_spec
+
+swagger_info = {
+    'title': "My API",
+    'version': "1.0.0",
+    'tag_list': [{'name': 'users', 'description': 'Users'}],
+    'show_head': False
+}
+plugins = [MarshmallowPlugin]
+
+
+class Schema(marshmallow.Schema):
+    name = marshmallow.fields.String(required=True)
+
+
+user_info = Service(name='users',
+                    path='/users',
+                    validators=(marshmallow_body_validator,),
+                    apispec_show=True,
+                    apispec_tags=['users'],
+                    apispec_response_schemas={200: Schema},
+                    description='Get and set user data.')
+
+
+@user_info.get()
+def get_info(request):
+    return {'name': 'Name'}
+
+
+@view_config(route_name='openapi_spec', renderer='json')
+def api_spec(request):
+    return generate_spec(request, swagger_info, plugins=plugins)
+
+
+def make_request(registry, host='localhost:80'):
+    request = Request.blank('/', base_url='http://{}'.format(host))
+    request.registry = registry
+    return request
+
+
+def make_config(settings):
+    config = Configurator(settings=settings)
+
+    config.include('cornice')
+    config.include('cornice_apispec')
+
+    config.add_route('openapi_spec', '/api-info')
+
+    config.scan(exclude=['tests'])
+
+    return config
+
+
+@pytest.fixture
+def config():
+    return make_config({'cornice_apispec.cache_size': '2'})
+
+
+@pytest.fixture
+def app(config):
+    return TestApp(config.make_wsgi_app())
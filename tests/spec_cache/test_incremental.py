@@ -0,0 +1,65 @@
+import json
+
+from cornice import Service
+
+from cornice_apispec import generate_spec, invalidate_spec_cache, paths
+
+from .conftest import make_request, plugins, swagger_info
+
+
+def count_conversions(monkeypatch):
+    converted = []
+    get_route_operations = paths.get_route_operations
+
+    def counting_get_route_operations(registry, route, *args, **kwargs):
+        converted.append(route['name'])
+        return get_route_operations(registry, route, *args, **kwargs)
+
+    monkeypatch.setattr(paths, 'get_route_operations', counting_get_route_operations)
+    return converted
+
+
+def dump(spec):
+    return json.dumps(spec, sort_keys=True)
+
+
+def test_commit_converts_new_routes_only(config, app, monkeypatch):
+    request = make_request(app.app.registry)
+    converted = count_conversions(monkeypatch)
+    generate_spec(request, swagger_info, plugins=plugins)
+
+    late_service = Service(name='late', path='/late', apispec_show=True, apispec_tags=['users'])
+    late_service.add_view('GET', lambda request: {})
+    config.add_cornice_service(late_service)
+    config.commit()
+    spec = generate_spec(request, swagger_info, plugins=plugins)
+
+    assert converted == ['users', 'late']
+    assert dump(spec) == dump(generate_spec(request, swagger_info, plugins=plugins, use_cache=False))
+
+
+def test_commit_converts_changed_routes(config, app, monkeypatch):
+    request = make_request(app.app.registry)
+    converted = count_conversions(monkeypatch)
+    generate_spec(request, swagger_info, plugins=plugins)
+
+    config.add_view(lambda request: {}, route_name='users', request_method='DELETE', renderer='json',
+                    apispec_show=True, apispec_summary='Delete user data')
+    config.commit()
+    spec = generate_spec(request, swagger_info, plugins=plugins)
+
+    assert converted == ['users', 'users']
+    assert spec['paths']['/users']['delete']['summary'] == 'Delete user data'
+    assert dump(spec) == dump(generate_spec(request, swagger_info, plugins=plugins, use_cache=False))
+
+
+def test_invalidate_drops_fragments(app, monkeypatch):
+    registry = app.app.registry
+    request = make_request(registry)
+    converted = count_conversions(monkeypatch)
+
+    generate_spec(request, swagger_info, plugins=plugins)
+    invalidate_spec_cache(registry)
+    generate_spec(request, swagger_info, plugins=plugins)
+
+    assert converted == ['users', 'users']
@@ -0,0 +1,158 @@
+import os
+import select
+import threading
+
+import pytest
+from cornice import Service
+
+from cornice_apispec import disk_cache, generate_spec, invalidate_spec_cache
+from cornice_apispec.cache import get_spec_cache
+from cornice_apispec.document import get_spec_document
+
+from .conftest import make_config, make_request, plugins, swagger_info
+
+
+class BlockingBuilds(object):
+
+    def __init__(self, monkeypatch):
+        self.calls = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.error = None
+        build_spec = disk_cache.build_spec
+
+        def blocking_build_spec(*args, **kwargs):
+            self.calls.append(threading.current_thread().name)
+            self.started.set()
+            self.release.wait(5)
+            if self.error is not None:
+                raise self.error
+            return build_spec(*args, **kwargs)
+
+        monkeypatch.setattr(disk_cache, 'build_spec', blocking_build_spec)
+
+
+def start_threads(target, count):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(target())) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_concurrent_builds_are_coalesced(app, monkeypatch):
+    registry = app.app.registry
+    builds = BlockingBuilds(monkeypatch)
+
+    threads, documents = start_threads(lambda: get_spec_document(registry, swagger_info, plugins), 8)
+    builds.started.wait(5)
+    builds.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(builds.calls) == 1
+    assert len(documents) == 8
+    assert all(spec_document is documents[0] for spec_document in documents)
+
+
+def test_failed_build_is_not_cached(app, monkeypatch):
+    registry = app.app.registry
+    builds = BlockingBuilds(monkeypatch)
+    builds.error = ValueError('broken')
+    builds.release.set()
+
+    with pytest.raises(ValueError):
+        get_spec_document(registry, swagger_info, plugins)
+    builds.error = None
+
+    assert get_spec_document(registry, swagger_info, plugins) is not None
+    assert len(builds.calls) == 2
+
+
+def test_build_in_flight_is_not_cached_after_invalidation(app, monkeypatch):
+    registry = app.app.registry
+    builds = BlockingBuilds(monkeypatch)
+
+    threads, documents = start_threads(lambda: get_spec_document(registry, swagger_info, plugins), 1)
+    builds.started.wait(5)
+    invalidate_spec_cache(registry)
+    builds.release.set()
+    threads[0].join(5)
+
+    assert documents[0] is not None
+    assert len(get_spec_cache(registry)) == 0
+
+
+def test_waiters_build_after_timeout(app, monkeypatch):
+    registry = app.app.registry
+    builds = BlockingBuilds(monkeypatch)
+    get_spec_cache(registry).wait_timeout = 0.1
+
+    threads, documents = start_threads(lambda: get_spec_document(registry, swagger_info, plugins), 1)
+    builds.started.wait(5)
+    waiter_threads, waiter_documents = start_threads(lambda: get_spec_document(registry, swagger_info, plugins), 1)
+    waiter_threads[0].join(0.5)
+    waited = waiter_threads[0].is_alive()
+    builds.release.set()
+    for thread in threads + waiter_threads:
+        thread.join(5)
+
+    assert len(builds.calls) == 2
+    assert waited
+    assert documents[0] is not None and waiter_documents[0] is not None
+
+
+@pytest.mark.skipif(not hasattr(os, 'register_at_fork'), reason='needs os.register_at_fork')
+def test_fork_during_build(app, monkeypatch):
+    registry = app.app.registry
+    builds = BlockingBuilds(monkeypatch)
+    threads, _ = start_threads(lambda: get_spec_document(registry, swagger_info, plugins), 1)
+    builds.started.wait(5)
+
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # the build thread is not running here
+        try:
+            builds.release.set()
+            spec_document = get_spec_document(registry, swagger_info, plugins)
+            os.write(write_end, b'built' if spec_document is not None else b'none')
+        finally:
+            os._exit(0)
+    os.close(write_end)
+    readable, _, _ = select.select([read_end], [], [], 10)
+    output = os.read(read_end, 16) if readable else b'timeout'
+    os.close(read_end)
+    if not readable:
+        os.kill(pid, 9)
+    os.waitpid(pid, 0)
+    builds.release.set()
+    threads[0].join(5)
+
+    assert output == b'built'
+
+
+def test_stale_while_revalidate(monkeypatch):
+    config = make_config({'cornice_apispec.stale_while_revalidate': 'true'})
+    config.commit()
+    request = make_request(config.registry)
+    first = generate_spec(request, swagger_info, plugins=plugins)
+
+    late_service = Service(name='late', path='/late', apispec_show=True)
+    late_service.add_view('GET', lambda request: {})
+    config.add_cornice_service(late_service)
+    config.commit()
+    builds = BlockingBuilds(monkeypatch)
+
+    stale = generate_spec(request, swagger_info, plugins=plugins)
+    builds.started.wait(5)
+    again = generate_spec(request, swagger_info, plugins=plugins)
+    builds.release.set()
+    for thread in threading.enumerate():
+        if thread.name == 'cornice-apispec-rebuild':
+            thread.join(5)
+
+    assert stale['paths'] is first['paths']
+    assert again['paths'] is first['paths']
+    assert builds.calls == ['cornice-apispec-rebuild']
+    assert list(generate_spec(request, swagger_info, plugins=plugins)['paths']) == ['/users', '/late']
+    assert len(get_spec_cache(config.registry)._stale) == 0
@@ -0,0 +1,110 @@
+from cornice import Service
+
+from cornice_apispec import clear_caches, fields, generate_spec, invalidate_spec_cache, utils
+from cornice_apispec.cache import get_spec_cache
+from cornice_apispec.docstrings import _docstring_cache
+from cornice_apispec.document import get_spec_document
+
+from .conftest import make_request, plugins, swagger_info
+
+
+def test_swagger(app):
+
+    response = app.get('/api-info')
+
+    assert list(response.json['paths']) == ['/users']
+    assert response.json['servers'] == [{'url': 'http://localhost:80'}]
+
+
+def test_cache_hit_returns_same_document(app):
+    request = make_request(app.app.registry)
+
+    first = generate_spec(request, swagger_info, plugins=plugins)
+    second = generate_spec(request, swagger_info, plugins=plugins)
+
+    assert first == second
+    assert first['paths'] is second['paths']
+    assert generate_spec(request, swagger_info, plugins=plugins, use_cache=False)['paths'] is not first['paths']
+
+
+def test_callers_may_change_top_level_members(app):
+    request = make_request(app.app.registry)
+
+    first = generate_spec(request, swagger_info, plugins=plugins)
+    first['security'] = [{'token': []}]
+    first['info']['title'] = 'Changed'
+    first['components'].setdefault('securitySchemes', {})['token'] = {'type': 'http', 'scheme': 'bearer'}
+    first['components']['schemas']['Other'] = {'type': 'object'}
+
+    second = generate_spec(request, swagger_info, plugins=plugins)
+    assert 'security' not in second
+    assert second['info']['title'] == swagger_info['title']
+    assert 'securitySchemes' not in second['components']
+    assert 'Other' not in second['components']['schemas']
+
+
+def test_cache_key_includes_spec_options(app):
+    request = make_request(app.app.registry)
+
+    first = generate_spec(request, swagger_info, plugins=plugins)
+    other_info = dict(swagger_info, title='Other API')
+
+    assert generate_spec(request, other_info, plugins=plugins)['paths'] is not first['paths']
+    assert generate_spec(request, swagger_info, plugins=plugins, filter_by_tags=True)['paths'] is not first['paths']
+
+
+def test_invalidate_spec_cache(app):
+    registry = app.app.registry
+    request = make_request(registry)
+
+    first = generate_spec(request, swagger_info, plugins=plugins)
+    invalidate_spec_cache(registry)
+
+    assert generate_spec(request, swagger_info, plugins=plugins)['paths'] is not first['paths']
+
+
+def test_new_commit_invalidates_cache(config, app):
+    request = make_request(app.app.registry)
+    generate_spec(request, swagger_info, plugins=plugins)
+
+    late_service = Service(name='late', path='/late', apispec_show=True)
+    late_service.add_view('GET', lambda request: {})
+    config.add_cornice_service(late_service)
+    config.commit()
+
+    assert list(generate_spec(request, swagger_info, plugins=plugins)['paths']) == ['/users', '/late']
+
+
+def test_commit_without_views_keeps_cache(config, app):
+    request = make_request(app.app.registry)
+    first = generate_spec(request, swagger_info, plugins=plugins)
+
+    config.add_settings({'other.setting': 'value'})
+    config.commit()
+
+    assert generate_spec(request, swagger_info, plugins=plugins)['paths'] is first['paths']
+
+
+def test_per_host_variants_are_bounded(app):
+    registry = app.app.registry
+    first = generate_spec(make_request(registry, 'one.example.com'), swagger_info, plugins=plugins)
+    generate_spec(make_request(registry, 'two.example.com'), swagger_info, plugins=plugins)
+    generate_spec(make_request(registry, 'three.example.com'), swagger_info, plugins=plugins)
+
+    assert len(get_spec_document(registry, swagger_info, plugins)._variants) == 2
+    again = generate_spec(make_request(registry, 'one.example.com'), swagger_info, plugins=plugins)
+    assert again['servers'] is not first['servers']
+    assert again['paths'] is first['paths']
+
+
+def test_clear_caches(app):
+    registry = app.app.registry
+    generate_spec(make_request(registry), swagger_info, plugins=plugins)
+
+    clear_caches(registry)
+
+    assert len(get_spec_cache(registry)) == 0
+    assert len(_docstring_cache) == 0
+    assert len(utils._instance_names) == 0
+    assert fields._resolved == {}
+    assert not [service for service in registry.cornice_services.values() if '_apispec_methods' in service.__dict__]
@@ -0,0 +1,61 @@
+import marshmallow
+import pytest
+from apispec.ext.marshmallow import MarshmallowPlugin
+from pyramid.config import Configurator
+from webtest import TestApp
+from cornice import Service
+from cornice.validators import marshmallow_body_validator
+
+swagger_info = {
+    'title': "My API",
+    'version': "1.0.0",
+    'show_head': False
+}
+plugins = [MarshmallowPlugin]
+
+
+class Item(marshmallow.Schema):
+    title = marshmallow.fields.String()
+
+
+class Schema(marshmallow.Schema):
+    name = marshmallow.fields.String(required=True)
+    items = marshmallow.fields.Nested('Item', many=True)
+
+
+user_info = Service(name='users',
+                    path='/users',
+                    validators=(marshmallow_body_validator,),
+                    apispec_show=True,
+                    apispec_response_schemas={200: Schema, 404: lambda: Schema},
+                    description='Get and set user data.')
+
+
+@user_info.get()
+def get_info(request):
+    """Get user data."""
+    return {'name': 'Name'}
+
+
+def main(global_config, **settings):
+
+    config = Configurator(settings=settings)
+
+    config.include('cornice')
+    config.include('cornice_apispec')
+
+    config.cornice_apispec_add_spec_view(swagger_info=swagger_info, plugins=plugins)
+
+    config.scan(exclude=['tests'])
+
+    return config.make_wsgi_app()
+
+
+@pytest.fixture
+def cache_dir(tmpdir):
+    return str(tmpdir.join('spec_cache'))
+
+
+@pytest.fixture
+def app(cache_dir):
+    return TestApp(main({}, **{'cornice_apispec.cache_dir': cache_dir}))
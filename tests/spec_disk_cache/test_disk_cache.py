@@ -0,0 +1,103 @@
+import json
+import os
+import subprocess
+import sys
+
+import marshmallow
+from cornice import Service
+from webtest import TestApp
+
+from cornice_apispec import disk_cache
+from cornice_apispec.disk_cache import DiskCache, spec_fingerprint
+
+from .conftest import main, plugins, swagger_info
+
+
+def fingerprint(app, info=swagger_info):
+    return spec_fingerprint(app.app.registry, info, plugins)
+
+
+def test_build_is_stored(app, cache_dir):
+    body = app.get('/openapi.json').body
+
+    files = os.listdir(cache_dir)
+    assert files == ['{}.json'.format(fingerprint(app))]
+    with open(os.path.join(cache_dir, files[0])) as cache_file:
+        entry = json.load(cache_file)
+    assert entry['fingerprint'] == fingerprint(app)
+    assert json.loads(body.decode('utf-8')) == dict(entry['spec'], servers=[{'url': 'http://localhost:80'}])
+
+
+def test_restarted_worker_loads_without_building(app, cache_dir, monkeypatch):
+    first = app.get('/openapi.json')
+
+    def fail(*args, **kwargs):
+        raise AssertionError('spec rebuilt')
+
+    monkeypatch.setattr(disk_cache, 'build_spec', fail)
+    restarted = main({}, **{'cornice_apispec.cache_dir': cache_dir})
+    second = TestApp(restarted).get('/openapi.json')
+
+    assert second.body == first.body
+    assert second.etag == first.etag
+
+
+def test_fingerprint_follows_application(app):
+    assert fingerprint(app) == fingerprint(app)
+    assert fingerprint(app, dict(swagger_info, title='Other')) != fingerprint(app)
+
+    other_service = Service(name='other', path='/other', apispec_show=True)
+    other_service.add_view('GET', lambda request: {})
+    app.app.registry.cornice_services['/other'] = other_service
+
+    assert fingerprint(app) != spec_fingerprint(main({}).registry, swagger_info, plugins)
+
+
+def test_fingerprint_follows_schema_fields(app, monkeypatch):
+    before = fingerprint(app)
+    from .conftest import Schema
+
+    monkeypatch.setitem(Schema._declared_fields, 'email', marshmallow.fields.Email())
+
+    assert fingerprint(app) != before
+
+
+def test_fingerprint_follows_schemas_referenced_by_name(app, monkeypatch):
+    before = fingerprint(app)
+    from .conftest import Item
+
+    monkeypatch.setitem(Item._declared_fields, 'price', marshmallow.fields.Float())
+
+    assert fingerprint(app) != before
+
+
+def test_fingerprint_follows_docstrings(app, monkeypatch):
+    before = fingerprint(app)
+    from .conftest import get_info
+
+    monkeypatch.setattr(get_info, '__doc__', 'Get other user data.')
+
+    assert fingerprint(app) != before
+
+
+def test_fingerprint_is_stable_across_processes():
+    script = (
+        'from tests.spec_disk_cache.conftest import main, plugins, swagger_info\n'
+        'from cornice_apispec.disk_cache import spec_fingerprint\n'
+        'print(spec_fingerprint(main({}).registry, swagger_info, plugins))\n'
+    )
+    fingerprints = set()
+    for seed in ('1', '2'):
+        env = dict(os.environ, PYTHONHASHSEED=seed)
+        fingerprints.add(subprocess.check_output([sys.executable, '-c', script], env=env).strip())
+
+    assert len(fingerprints) == 1
+
+
+def test_mismatching_file_is_ignored(cache_dir):
+    cache = DiskCache(cache_dir)
+    cache.store('abc', {'openapi': '3.0.2'})
+    os.rename(cache.path('abc'), cache.path('def'))
+
+    assert cache.load('abc') is None
+    assert cache.load('def') is None
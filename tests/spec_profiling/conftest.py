@@ -0,0 +1,65 @@
+import pytest
+from apispec.ext.marshmallow import MarshmallowPlugin
+from pyramid.config import Configurator
+from webtest import TestApp
+from cornice import Service
+
+reports = []
+
+
+def collect_report(report):
+    reports.append(report)
+
+
+user_info = Service(name='users',
+                    path='/users',
+                    apispec_show=True,
+                    description='Get and set user data.')
+
+
+@user_info.get()
+def get_info(request):
+    return {'name': 'Name'}
+
+
+@user_info.post()
+def post_info(request):
+    """Create an user.
+
+    ---
+    post:
+        description: Create an user
+        responses:
+            201:
+                description: Created
+    """
+    return {'name': 'Name'}
+
+
+def main(global_config, **settings):
+
+    config = Configurator(settings=settings)
+
+    config.include('cornice')
+    config.include('cornice_apispec')
+
+    config.cornice_apispec_add_spec_view(swagger_info={'title': "My API"}, plugins=[MarshmallowPlugin])
+
+    config.scan(exclude=['tests'])
+
+    return config.make_wsgi_app()
+
+
+@pytest.fixture
+def app():
+    app = main({})
+
+    return TestApp(app)
+
+
+@pytest.fixture
+def profiled_app():
+    del reports[:]
+    app = main({}, **{'cornice_apispec.profile_callback': 'tests.spec_profiling.conftest:collect_report'})
+
+    return TestApp(app)
@@ -0,0 +1,53 @@
+from apispec.ext.marshmallow import MarshmallowPlugin
+from pyramid.request import Request
+
+from cornice_apispec import generate_spec
+from cornice_apispec.profiling import NULL_PROFILER, PHASES, SpecProfiler, get_profiler
+
+from .conftest import reports
+
+
+def make_request(app):
+    request = Request.blank('/')
+    request.registry = app.app.registry
+    return request
+
+
+def test_report(app):
+    profiler = SpecProfiler()
+
+    generate_spec(make_request(app), {'title': "My API"}, plugins=[MarshmallowPlugin], profiler=profiler)
+
+    report = profiler.report()
+    assert report['total_seconds'] > 0
+    assert list(report['routes']) == ['users']
+    assert report['routes']['users']['calls'] == 1
+    assert set(report['phases']) == set(PHASES)
+    assert report['phases']['docstrings']['calls'] >= 2
+    assert report['phases']['autodoc']['calls'] >= 1
+    assert report['phases']['paths']['calls'] == 1
+    assert report['phases']['to_dict']['calls'] == 1
+
+
+def test_nothing_recorded_on_cache_hit(app):
+    request = make_request(app)
+    generate_spec(request, {'title': "My API"}, plugins=[MarshmallowPlugin])
+    profiler = SpecProfiler()
+
+    generate_spec(request, {'title': "My API"}, plugins=[MarshmallowPlugin], profiler=profiler)
+
+    assert profiler.report()['total_seconds'] is None
+
+
+def test_disabled_by_default(app):
+    assert get_profiler(app.app.registry) is NULL_PROFILER
+
+
+def test_callback_setting(profiled_app):
+    assert reports == []
+
+    profiled_app.get('/openapi.json')
+    profiled_app.get('/openapi.json')
+
+    assert len(reports) == 1
+    assert list(reports[0]['routes']) == ['users']
@@ -0,0 +1,79 @@
+import marshmallow
+import pytest
+from apispec.ext.marshmallow import MarshmallowPlugin
+from pyramid.config import Configurator
+from webtest import TestApp
+from cornice import Service
+
+swagger_info = {
+    'title': "My API",
+    'version': "1.0.0",
+    'tag_list': [{'name': 'users', 'description': 'Users'}],
+    'show_head': False
+}
+
+
+class AddressSchema(marshmallow.Schema):
+    street = marshmallow.fields.String()
+
+
+class UserSchema(marshmallow.Schema):
+    name = marshmallow.fields.String(required=True)
+    address = marshmallow.fields.Nested(AddressSchema)
+
+
+class ItemSchema(marshmallow.Schema):
+    label = marshmallow.fields.String()
+
+
+users = Service(name='users',
+                path='/users',
+                apispec_show=True,
+                apispec_tags=['users'],
+                apispec_response_schemas={200: UserSchema})
+
+items = Service(name='items',
+                path='/items',
+                apispec_show=True,
+                apispec_tags=['items'],
+                apispec_response_schemas={200: ItemSchema})
+
+health = Service(name='health',
+                 path='/health',
+                 apispec_show=True)
+
+
+@users.get()
+def get_users(request):
+    return []
+
+
+@items.get()
+def get_items(request):
+    return []
+
+
+@health.get()
+def get_health(request):
+    return 'OK'
+
+
+def main(global_config, **settings):
+
+    config = Configurator(settings=settings)
+
+    config.include('cornice')
+    config.include('cornice_apispec')
+
+    config.cornice_apispec_add_spec_shard_views(swagger_info=swagger_info, plugins=[MarshmallowPlugin])
+
+    config.scan(exclude=['tests'])
+
+    return config.make_wsgi_app()
+
+
+@pytest.fixture
+def app():
+    app = main({})
+
+    return TestApp(app)
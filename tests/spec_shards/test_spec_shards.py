@@ -0,0 +1,80 @@
+from cornice_apispec.cache import get_spec_cache
+from cornice_apispec.shards import split_spec
+
+
+def test_index(app):
+    response = app.get('/openapi/index.json')
+
+    assert sorted(response.json['urls'], key=lambda shard: shard['name']) == [
+        {'name': 'default', 'description': '', 'url': 'http://localhost/openapi/default.json'},
+        {'name': 'items', 'description': '', 'url': 'http://localhost/openapi/items.json'},
+        {'name': 'users', 'description': 'Users', 'url': 'http://localhost/openapi/users.json'},
+    ]
+
+
+def test_shard_carries_its_referenced_components(app):
+    spec = app.get('/openapi/users.json').json
+
+    assert list(spec['paths']) == ['/users']
+    assert spec['tags'] == [{'name': 'users', 'description': 'Users'}]
+    assert sorted(spec['components']['schemas']) == ['Address', 'UserSchema']
+    assert spec['servers'] == [{'url': 'http://localhost:80'}]
+    assert spec['info']['title'] == 'My API'
+
+
+def test_other_shards(app):
+    items = app.get('/openapi/items.json').json
+    untagged = app.get('/openapi/default.json').json
+
+    assert list(items['paths']) == ['/items']
+    assert list(items['components']['schemas']) == ['ItemSchema']
+    assert list(untagged['paths']) == ['/health']
+    assert 'components' not in untagged
+
+
+def test_unknown_shard(app):
+    app.get('/openapi/unknown.json', status=404)
+
+
+def test_shards_are_built_once(app):
+    app.get('/openapi/users.json')
+    cache = get_spec_cache(app.app.registry)
+    size = len(cache)
+
+    first = app.get('/openapi/items.json')
+    second = app.get('/openapi/items.json', headers={'If-None-Match': first.etag}, status=304)
+
+    assert len(cache) == size
+    assert second.etag == first.etag
+
+
+def test_split_spec_follows_refs():
+    spec = {
+        'openapi': '3.0.2',
+        'info': {'title': 'API', 'version': '1'},
+        'paths': {
+            '/a': {
+                'parameters': [{'$ref': '#/components/parameters/Id'}],
+                'get': {'tags': ['a', 'b'], 'responses': {'200': {'$ref': '#/components/responses/A'}}},
+            },
+        },
+        'components': {
+            'parameters': {'Id': {'name': 'id', 'in': 'path'}},
+            'responses': {'A': {'content': {'application/json': {'schema': {'$ref': '#/components/schemas/A'}}}}},
+            'schemas': {
+                'A': {'properties': {'b': {'items': {'$ref': '#/components/schemas/B'}}}},
+                'B': {'properties': {'a': {'$ref': '#/components/schemas/A'}}},
+                'C': {},
+            },
+        },
+    }
+
+    shards = split_spec(spec)
+
+    assert list(shards) == ['a', 'b']
+    assert shards['a']['paths'] == shards['b']['paths'] == spec['paths']
+    assert shards['a']['components'] == {
+        'parameters': spec['components']['parameters'],
+        'responses': spec['components']['responses'],
+        'schemas': {'A': spec['components']['schemas']['A'], 'B': spec['components']['schemas']['B']},
+    }
@@ -0,0 +1,68 @@
+import marshmallow
+import pytest
+from apispec.ext.marshmallow import MarshmallowPlugin
+from pyramid.config import Configurator
+from webtest import TestApp
+from cornice import Service
+from cornice.validators import marshmallow_body_validator
+
+swagger_info = {
+    'title': "My API",
+    'version': "1.0.0",
+    'tag_list': [{'name': 'users', 'description': 'Users'}],
+    'main_description': "Main description for API",
+    'show_head': False
+}
+
+
+class Schema(marshmallow.Schema):
+    name = marshmallow.fields.String(required=True)
+
+
+user_info = Service(name='users',
+                    path='/users',
+                    validators=(marshmallow_body_validator,),
+                    apispec_show=True,
+                    apispec_tags=['users'],
+                    apispec_response_schemas={200: Schema},
+                    description='Get and set user data.')
+
+
+@user_info.get()
+def get_info(request):
+    return {'name': 'Name'}
+
+
+def main(global_config, **settings):
+
+    config = Configurator(settings=settings)
+
+    config.include('cornice')
+    config.include('cornice_apispec')
+
+    config.cornice_apispec_add_spec_view(swagger_info=swagger_info, plugins=[MarshmallowPlugin])
+
+    config.scan(exclude=['tests'])
+
+    return config.make_wsgi_app()
+
+
+@pytest.fixture
+def app():
+    app = main({})
+
+    return TestApp(app)
+
+
+@pytest.fixture
+def eager_app():
+    app = main({}, **{'cornice_apispec.eager': 'true'})
+
+    return TestApp(app)
+
+
+@pytest.fixture
+def stream_app():
+    app = main({}, **{'cornice_apispec.stream': 'true'})
+
+    return TestApp(app)
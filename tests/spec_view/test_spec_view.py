@@ -0,0 +1,105 @@
+import gzip
+import hashlib
+
+from apispec.ext.marshmallow import MarshmallowPlugin
+from pyramid.request import Request
+
+from cornice_apispec import generate_spec
+from cornice_apispec.cache import get_spec_cache
+
+from .conftest import swagger_info
+
+
+def test_swagger(app):
+
+    response = app.get('/openapi.json')
+
+    expected = {'paths': {'/users': {'get': {'tags': ['users'], 'responses': {'200': {'description': '', 'content': {'text/plain': {'schema': {'$ref': '#/components/schemas/Schema'}}}}}}}}, 'info': {'title': 'My API', 'version': '1.0.0', 'description': 'Main description for API'}, 'tags': [{'name': 'users', 'description': 'Users'}], 'openapi': '3.0.2', 'components': {'schemas': {'Schema': {'type': 'object', 'properties': {'name': {'type': 'string'}}, 'required': ['name']}}}, 'servers': [{'url': 'http://localhost:80'}]}
+
+    assert response.content_type == 'application/json'
+    assert response.json == expected
+
+
+def test_servers_follow_request_host(app):
+
+    response = app.get('/openapi.json', extra_environ={'HTTP_HOST': 'api.example.com:8080'})
+
+    assert response.json['servers'] == [{'url': 'http://api.example.com:8080'}]
+
+
+def test_same_document_as_generate_spec(app):
+    request = Request.blank('/')
+    request.registry = app.app.registry
+
+    response = app.get('/openapi.json')
+
+    assert response.json == generate_spec(request, swagger_info, plugins=[MarshmallowPlugin])
+
+
+def test_lazy_build(app):
+    assert len(get_spec_cache(app.app.registry)) == 0
+
+    app.get('/openapi.json')
+
+    assert len(get_spec_cache(app.app.registry)) == 1
+
+
+def test_eager_build(eager_app):
+    registry = eager_app.app.registry
+    assert len(get_spec_cache(registry)) == 1
+
+    document = registry.cornice_apispec_views['openapi_spec'].get_document(registry)
+    response = eager_app.get('/openapi.json')
+
+    assert list(document.spec['paths']) == ['/users']
+    assert len(get_spec_cache(registry)) == 1
+    assert response.json['paths'] == document.spec['paths']
+
+
+def test_etag(app):
+
+    response = app.get('/openapi.json')
+
+    assert response.etag == hashlib.sha1(response.body).hexdigest()
+    assert response.last_modified is not None
+    assert app.get('/openapi.json').etag == response.etag
+    assert app.get('/openapi.json', extra_environ={'HTTP_HOST': 'other:80'}).etag != response.etag
+
+
+def test_if_none_match(app):
+    etag = app.get('/openapi.json').etag
+
+    response = app.get('/openapi.json', headers={'If-None-Match': '"{}"'.format(etag)}, status=304)
+
+    assert response.body == b''
+    assert response.etag == etag
+    app.get('/openapi.json', headers={'If-None-Match': '"stale"'}, status=200)
+
+
+def test_if_modified_since(app):
+    last_modified = app.get('/openapi.json').headers['Last-Modified']
+
+    app.get('/openapi.json', headers={'If-Modified-Since': last_modified}, status=304)
+    app.get('/openapi.json', headers={'If-Modified-Since': 'Wed, 21 Oct 2015 07:28:00 GMT'}, status=200)
+
+
+def test_gzip(app):
+    plain = app.get('/openapi.json')
+
+    # WebTest decodes compressed responses, so call the WSGI app directly
+    response = Request.blank('/openapi.json', headers={'Accept-Encoding': 'gzip, deflate'}).get_response(app.app)
+
+    assert response.content_encoding == 'gzip'
+    assert response.headers['Vary'] == 'Accept, Accept-Encoding'
+    assert gzip.decompress(response.body) == plain.body
+    assert response.etag != plain.etag
+    app.get('/openapi.json', headers={'Accept-Encoding': 'gzip', 'If-None-Match': '"{}"'.format(response.etag)},
+            status=304)
+
+
+def test_identity_preferred(app):
+
+    response = app.get('/openapi.json', headers={'Accept-Encoding': 'gzip;q=0.5, identity'})
+
+    assert response.content_encoding is None
+    assert response.json['paths']
@@ -0,0 +1,54 @@
+import gzip
+import io
+import json
+
+from pyramid.request import Request
+
+from cornice_apispec.serializers import iter_json
+
+
+def test_stream_same_body_and_etag(app, stream_app):
+    cached = app.get('/openapi.json')
+    streamed = stream_app.get('/openapi.json')
+
+    assert streamed.body == cached.body
+    assert streamed.etag == cached.etag
+    assert streamed.content_type == 'application/json'
+
+
+def test_stream_is_not_materialized(stream_app):
+    request = Request.blank('/openapi.json')
+
+    response = request.get_response(stream_app.app)
+
+    assert not isinstance(response.app_iter, (list, tuple))
+    assert json.loads(b''.join(response.app_iter))['paths']
+
+
+def test_stream_not_modified(stream_app):
+    etag = stream_app.get('/openapi.json').etag
+
+    stream_app.get('/openapi.json', headers={'If-None-Match': '"{}"'.format(etag)}, status=304)
+
+
+def test_stream_gzip(stream_app, app):
+    request = Request.blank('/openapi.json', headers={'Accept-Encoding': 'gzip, br'})
+
+    response = request.get_response(stream_app.app)
+
+    assert response.content_encoding == 'gzip'
+    body = gzip.GzipFile(fileobj=io.BytesIO(b''.join(response.app_iter))).read()
+    assert body == app.get('/openapi.json').body
+
+
+def test_iter_json_chunks():
+    spec = {
+        'openapi': '3.0.2',
+        'paths': dict(('/resources_{}'.format(index), {'get': {'summary': 'é' * 100}}) for index in range(50)),
+        'components': {'schemas': {'A': {'type': 'object'}}},
+    }
+
+    chunks = list(iter_json(spec, chunk_size=1024))
+
+    assert len(chunks) > 1
+    assert b''.join(chunks) == json.dumps(spec).encode('utf-8')
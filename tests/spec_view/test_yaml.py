@@ -0,0 +1,84 @@
+import gzip
+
+import yaml
+from pyramid.config import Configurator
+from pyramid.request import Request
+
+from cornice_apispec import document
+
+
+def test_yaml_route(app):
+    json_response = app.get('/openapi.json')
+
+    response = app.get('/openapi.yaml')
+
+    assert response.content_type == 'application/yaml'
+    assert yaml.safe_load(response.text) == json_response.json
+    assert response.etag != json_response.etag
+
+
+def test_no_yaml_route_without_spec_view():
+    config = Configurator()
+    config.include('cornice_apispec')
+    config.commit()
+
+    assert config.registry.introspector.get('routes', 'openapi_spec') is not None
+    assert config.registry.introspector.get('routes', 'openapi_spec_yaml') is None
+
+
+def test_yaml_server_url(app):
+    response = app.get('/openapi.yaml', extra_environ={'HTTP_HOST': 'api.example.com:8080'})
+
+    assert yaml.safe_load(response.text)['servers'] == [{'url': 'http://api.example.com:8080'}]
+
+
+def test_accept_negotiates_format(app):
+    for accept in ('application/yaml', 'application/x-yaml', 'text/yaml', 'application/json;q=0.5, text/yaml'):
+        response = app.get('/openapi.json', headers={'Accept': accept})
+        assert response.content_type == 'application/yaml'
+
+    assert app.get('/openapi.yaml', headers={'Accept': 'application/json'}).content_type == 'application/json'
+    assert app.get('/openapi.json', headers={'Accept': '*/*'}).content_type == 'application/json'
+    assert app.get('/openapi.yaml', headers={'Accept': '*/*'}).content_type == 'application/yaml'
+    assert app.get('/openapi.yaml', headers={'Accept': 'text/html'}).content_type == 'application/yaml'
+    assert 'Accept' in app.get('/openapi.json').headers['Vary']
+
+
+def test_yaml_not_modified(app):
+    etag = app.get('/openapi.yaml').etag
+
+    app.get('/openapi.yaml', headers={'If-None-Match': '"{}"'.format(etag)}, status=304)
+    app.get('/openapi.json', headers={'If-None-Match': '"{}"'.format(etag)}, status=200)
+
+
+def test_yaml_gzip(app):
+    plain = app.get('/openapi.yaml')
+
+    response = Request.blank('/openapi.yaml', headers={'Accept-Encoding': 'gzip'}).get_response(app.app)
+
+    assert response.content_encoding == 'gzip'
+    assert response.etag == '{}-gzip'.format(plain.etag)
+    assert gzip.decompress(response.body) == plain.body
+
+
+def test_yaml_dumped_once(app, monkeypatch):
+    dumps = []
+
+    def dump_spec(spec, output_format='json', **kwargs):
+        dumps.append(output_format)
+        return original(spec, output_format, **kwargs)
+
+    original = document.dump_spec
+    monkeypatch.setattr(document, 'dump_spec', dump_spec)
+
+    for host in ('a.example.com', 'b.example.com', 'a.example.com'):
+        app.get('/openapi.yaml', extra_environ={'HTTP_HOST': host})
+
+    assert dumps == ['yaml']
+
+
+def test_stream_serves_yaml_body(stream_app):
+    response = stream_app.get('/openapi.json', headers={'Accept': 'application/yaml'})
+
+    assert response.content_type == 'application/yaml'
+    assert yaml.safe_load(response.text)['paths']
@@ -0,0 +1,48 @@
+import pytest
+from apispec.ext.marshmallow import MarshmallowPlugin
+from pyramid.config import Configurator
+from webtest import TestApp
+from cornice import Service
+
+swagger_info = {
+    'title': "My API",
+    'version': "1.0.0",
+}
+
+user_info = Service(name='users',
+                    path='/users',
+                    apispec_show=True,
+                    description='Get and set user data.')
+
+
+@user_info.get()
+def get_info(request):
+    return {'name': 'Name'}
+
+
+def main(global_config, **settings):
+
+    config = Configurator(settings=settings)
+
+    config.include('cornice')
+    config.include('cornice_apispec')
+
+    config.cornice_apispec_add_spec_view(swagger_info=swagger_info, plugins=[MarshmallowPlugin])
+
+    config.scan(exclude=['tests'])
+
+    return config.make_wsgi_app()
+
+
+WARMUP_SETTINGS = {
+    'cornice_apispec.warmup': 'true',
+    'cornice_apispec.warmup_scheme': 'https',
+    'cornice_apispec.warmup_host': 'api.example.com',
+}
+
+
+@pytest.fixture
+def app():
+    app = main({}, **WARMUP_SETTINGS)
+
+    return TestApp(app)
@@ -0,0 +1,75 @@
+import threading
+
+from cornice_apispec import cache, disk_cache, warmup
+from cornice_apispec.cache import get_spec_cache
+
+from .conftest import WARMUP_SETTINGS, main
+
+
+def count_builds(monkeypatch, started=None, release=None):
+    builds = []
+    build_spec = disk_cache.build_spec
+
+    def blocking_build_spec(*args, **kwargs):
+        builds.append(threading.current_thread().name)
+        if started is not None:
+            started.set()
+            release.wait(5)
+        return build_spec(*args, **kwargs)
+
+    monkeypatch.setattr(disk_cache, 'build_spec', blocking_build_spec)
+    return builds
+
+
+def test_warm_up_builds_in_background(app):
+    registry = app.app.registry
+    registry.cornice_apispec_warmup.result(5)
+
+    cache = get_spec_cache(registry)
+    assert len(cache) == 1
+    spec_document = list(cache._data.values())[0]
+    assert 'https://api.example.com' in spec_document._variants
+    assert spec_document.variant('https://api.example.com')._bodies
+
+
+def test_requests_wait_for_warm_up(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    builds = count_builds(monkeypatch, started, release)
+    app = main({}, **WARMUP_SETTINGS)
+    started.wait(5)
+
+    responses = []
+    request_thread = threading.Thread(target=lambda: responses.append(
+        app({'REQUEST_METHOD': 'GET', 'PATH_INFO': '/openapi.json', 'SERVER_NAME': 'localhost',
+             'SERVER_PORT': '80', 'wsgi.url_scheme': 'http'}, lambda status, headers: None)))
+    request_thread.start()
+    request_thread.join(0.2)
+    assert not responses
+    release.set()
+    request_thread.join(5)
+
+    assert builds == ['cornice-apispec-warmup']
+    assert responses
+
+
+def test_disabled_by_default():
+    registry = main({}).registry
+
+    assert getattr(registry, 'cornice_apispec_warmup', None) is None
+    assert len(get_spec_cache(registry)) == 0
+
+
+def test_interrupted_warm_up_restarts_after_fork(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    count_builds(monkeypatch, started, release)
+    registry = main({}, **WARMUP_SETTINGS).registry
+    started.wait(5)
+    interrupted = registry.cornice_apispec_warmup
+
+    cache._reset_caches_after_fork()
+    warmup._after_fork_in_child()
+    release.set()
+
+    assert registry.cornice_apispec_warmup is not interrupted
+    registry.cornice_apispec_warmup.result(5)
+    interrupted.result(5)